@@ -0,0 +1,80 @@
+"""Compare decoding pub event responses via dicts against validating the bytes directly.
+
+Run with: python -m benchmarks.ferry_decode
+"""
+
+import json
+import random
+import timeit
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from pydantic import TypeAdapter
+
+from kmibot.api import PUB_EVENT_PAGE_ADAPTER, PubEventSchema
+
+
+def build_person(rng: random.Random) -> dict:
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "display_name": f"Person {rng.randrange(10_000)}",
+        "discord_id": rng.randrange(10**17, 10**18),
+    }
+
+
+def build_pub_event(rng: random.Random, attendees: int) -> dict:
+    timestamp = datetime(2026, 1, 1, 20, tzinfo=UTC) + timedelta(days=rng.randrange(365))
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "timestamp": timestamp.isoformat(),
+        "pub": str(uuid.UUID(int=rng.getrandbits(128))),
+        "discord_id": rng.randrange(10**17, 10**18),
+        "table": None,
+        "booking": None,
+        "attendees": [build_person(rng) for _ in range(attendees)],
+        "tombstoned_attendees": [build_person(rng) for _ in range(attendees // 10)],
+        "announcements": ["Bring a coat"],
+    }
+
+
+def build_page(events: int, attendees: int, seed: int = 1) -> bytes:
+    rng = random.Random(seed)
+    page = {
+        "count": events,
+        "next": None,
+        "previous": None,
+        "results": [build_pub_event(rng, attendees) for _ in range(events)],
+    }
+    return json.dumps(page).encode()
+
+
+def via_dicts(content: bytes) -> list[PubEventSchema]:
+    # What FerryAPI did before: decode to dicts, then build an adapter and validate them.
+    data = json.loads(content)
+    ta = TypeAdapter(list[PubEventSchema])
+    return ta.validate_python(data["results"])
+
+
+def via_dicts_cached_adapter(content: bytes) -> list[PubEventSchema]:
+    return PUB_EVENT_PAGE_ADAPTER.validate_python(json.loads(content)).results
+
+
+def via_bytes(content: bytes) -> list[PubEventSchema]:
+    return PUB_EVENT_PAGE_ADAPTER.validate_json(content).results
+
+
+def main() -> None:
+    for events, attendees in [(1, 10), (1, 500), (20, 500)]:
+        content = build_page(events, attendees)
+        print(f"{events} events x {attendees} attendees ({len(content) / 1024:.0f} KiB)")
+        for name, func in [
+            ("json + new TypeAdapter (old)", via_dicts),
+            ("json + cached TypeAdapter", via_dicts_cached_adapter),
+            ("validate_json", via_bytes),
+        ]:
+            runs = timeit.repeat(lambda: func(content), number=20, repeat=5)  # noqa: B023
+            print(f"  {name:<30} {min(runs) / 20 * 1e3:8.3f} ms/response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare banned-word matching against the per-message regex it replaced.
+
+Run with: python -m benchmarks.ferry_matcher
+"""
+
+import random
+import re
+import timeit
+
+from kmibot.modules.ferry.matcher import BannedWordMatcher
+
+BANNED_WORD = "train"
+VARIANTS = ["trains", "choo choo"]
+
+VOCABULARY = """
+    the pub is at eight tonight who is coming I will be late sorry
+    does anyone have the slides from the lecture meeting moved to thursday
+    that was a great talk thanks for organising lunch anyone fancy coffee
+    radio antenna contest logging frequency band propagation station
+    yes no maybe lol nice okay cool anyway weekend exam deadline
+""".split()
+# Words that contain a banned word without being one, and so get past the prefilter.
+DECOYS = ["strain", "restraint", "trainee", "constraint"]
+EXTRAS = [
+    "https://example.com/some/long/path?query=1",
+    "😂😂😂",
+    "🍺",
+    "café",
+    "naïve",
+    "<@123456789012345678>",
+    "```python\nprint('hello')\n```",
+]
+
+
+def build_corpus(size: int, hit_rate: float, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = rng.choices(VOCABULARY, k=rng.randint(2, 40))
+        if rng.random() < 0.05:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(DECOYS))
+        if rng.random() < 0.2:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(EXTRAS))
+        if rng.random() < hit_rate:
+            words.insert(rng.randrange(len(words) + 1), rng.choice([BANNED_WORD, *VARIANTS]))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def baseline(corpus: list[str]) -> int:
+    count = 0
+    for content in corpus:
+        if re.match(rf"\b{BANNED_WORD}\b", content, flags=re.IGNORECASE):
+            count += 1
+    return count
+
+
+def search_per_message(corpus: list[str]) -> int:
+    count = 0
+    for content in corpus:
+        if re.search(rf"\b{BANNED_WORD}\b", content, flags=re.IGNORECASE):
+            count += 1
+    return count
+
+
+def matcher(corpus: list[str], engine: BannedWordMatcher) -> int:
+    return sum(1 for content in corpus if engine.matches(content))
+
+
+def main() -> None:
+    corpus = build_corpus(10_000, hit_rate=0.01)
+    engine = BannedWordMatcher([BANNED_WORD, *VARIANTS])
+
+    for name, func in [
+        ("re.match per message (old)", lambda: baseline(corpus)),
+        ("re.search per message", lambda: search_per_message(corpus)),
+        ("BannedWordMatcher", lambda: matcher(corpus, engine)),
+    ]:
+        runs = timeit.repeat(func, number=5, repeat=5)
+        per_message = min(runs) / 5 / len(corpus) * 1e9
+        print(f"{name:<30} {per_message:8.0f} ns/message  ({func()} matches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,64 @@
+import asyncio
+import importlib.util
+import logging
+import re
+import time
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Mapping,
+)
+from contextlib import aclosing
 from datetime import datetime
 from logging import getLogger
-from typing import Any
+from typing import Any, Generic, TypeVar
+from urllib.parse import urlencode
 from uuid import UUID
 import discord
 import httpx
-from pydantic import BaseModel, TypeAdapter, HttpUrl, validator
+from pydantic import BaseModel, TypeAdapter, HttpUrl, ValidationError, validator
+
+from . import metrics
+from .cache import SingleFlight, TTLCache
+from .config import FerryCacheConfig, FerryResilienceConfig, FerryTransportConfig
+from .lanes import PriorityLimiter, get_lane
+from .resilience import CircuitBreaker, RetryPolicy
 
 LOGGER = getLogger(__name__)
 
+T = TypeVar("T")
+
+REQUEST_DURATION = metrics.histogram(
+    "kmibot_ferry_request_duration_seconds",
+    "Time taken by Ferry API requests.",
+    ["method", "endpoint"],
+)
+RESPONSES = metrics.counter(
+    "kmibot_ferry_responses_total",
+    "Ferry API responses by status code.",
+    ["method", "endpoint", "status"],
+)
+REQUESTS_IN_FLIGHT = metrics.gauge(
+    "kmibot_ferry_requests_in_flight",
+    "Ferry API requests currently awaiting a response.",
+)
+REQUESTS_COLLAPSED = metrics.counter(
+    "kmibot_ferry_requests_collapsed_total",
+    "Ferry API GETs that shared an identical request already in flight.",
+    ["endpoint"],
+)
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27})$")
+
+
+def template_endpoint(endpoint: str) -> str:
+    path = endpoint.split("?", 1)[0]
+    return "/".join("{id}" if _ID_SEGMENT.match(part) else part for part in path.split("/"))
+
 
 class UserSchema(BaseModel):
     username: str
@@ -127,25 +178,324 @@ class PubEventTombstoneAlreadyExistsError(Exception):
     pass
 
 
+class PageSchema(BaseModel, Generic[T]):
+    next: str | None = None
+    results: list[T]
+
+
+# Building an adapter compiles a validator, so build them once rather than on every request.
+USER_ADAPTER = TypeAdapter(UserSchema)
+PERSON_ADAPTER = TypeAdapter(PersonSchema)
+PERSON_PAGE_ADAPTER = TypeAdapter(PageSchema[PersonSchema])
+PERSON_WITH_SCORE_PAGE_ADAPTER = TypeAdapter(PageSchema[PersonWithScoreSchema])
+FACT_ADAPTER = TypeAdapter(FactSchema)
+ACCUSATION_ADAPTER = TypeAdapter(AccusationSchema)
+RATIFICATION_ADAPTER = TypeAdapter(RatificationSchema)
+PUB_ADAPTER = TypeAdapter(PubSchema)
+PUB_PAGE_ADAPTER = TypeAdapter(PageSchema[PubSchema])
+PUB_EVENT_ADAPTER = TypeAdapter(PubEventSchema)
+PUB_EVENT_PAGE_ADAPTER = TypeAdapter(PageSchema[PubEventSchema])
+PUB_EVENT_TOMBSTONE_ADAPTER = TypeAdapter(PubEventTombstoneSchema)
+
+
+class Paginator(Generic[T]):
+    """Iterate over every result of a list endpoint, one page at a time.
+
+    The next page is fetched while the caller works through the current one. Iteration
+    stops after max_items results, without fetching pages that wouldn't be needed.
+    """
+
+    def __init__(
+        self,
+        api_client: "FerryAPI",
+        adapter: TypeAdapter[PageSchema[T]],
+        endpoint: str,
+        *,
+        max_items: int | None = None,
+    ) -> None:
+        self._api_client = api_client
+        self._adapter = adapter
+        self._endpoint = endpoint
+        self._max_items = max_items
+
+    def __aiter__(self) -> AsyncIterator[T]:
+        return self._iterate(self._max_items)
+
+    async def first(self) -> T | None:
+        async with aclosing(self._iterate(1)) as items:
+            async for item in items:
+                return item
+        return None
+
+    async def _fetch(self, endpoint: str) -> PageSchema[T]:
+        return await self._api_client._request_as(self._adapter, "GET", endpoint)
+
+    async def _iterate(self, max_items: int | None) -> AsyncGenerator[T, None]:
+        count = 0
+        if max_items is not None and max_items <= 0:
+            return
+
+        fetch: asyncio.Task[PageSchema[T]] | None = asyncio.create_task(self._fetch(self._endpoint))
+        try:
+            while fetch is not None:
+                page = await fetch
+                fetch = None
+                if page.next and (max_items is None or count + len(page.results) < max_items):
+                    fetch = asyncio.create_task(
+                        self._fetch(self._api_client.get_relative_endpoint(page.next))
+                    )
+
+                for item in page.results:
+                    yield item
+                    count += 1
+                    if max_items is not None and count >= max_items:
+                        return
+        finally:
+            if fetch is not None:
+                fetch.cancel()
+                await asyncio.gather(fetch, return_exceptions=True)
+
+
+class PubCatalogue:
+    """The list of pubs, revalidated in the background using conditional requests."""
+
+    def __init__(self, api_client: "FerryAPI", refresh_interval: float) -> None:
+        self._api_client = api_client
+        self._refresh_interval = refresh_interval
+        self._pubs: dict[UUID, PubSchema] | None = None
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task[None] | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._pubs is not None
+
+    def get_all(self) -> list[PubSchema]:
+        return list((self._pubs or {}).values())
+
+    def get(self, pub_id: UUID) -> PubSchema | None:
+        return (self._pubs or {}).get(pub_id)
+
+    def add(self, pub: PubSchema) -> None:
+        if self._pubs is not None:
+            self._pubs[pub.id] = pub
+
+    async def load(self) -> None:
+        try:
+            await self.revalidate()
+        finally:
+            # Keep trying in the background if the first load fails, e.g. while Ferry is down.
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._refresh_periodically())
+
+    async def close(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def revalidate(self) -> None:
+        async with self._lock:
+            headers = {}
+            if self._pubs is not None:
+                if self._etag:
+                    headers["If-None-Match"] = self._etag
+                if self._last_modified:
+                    headers["If-Modified-Since"] = self._last_modified
+
+            resp = await self._api_client._send("GET", "v2/pub/pubs/", headers=headers)
+            if resp.status_code == 304:
+                LOGGER.info("Pub catalogue is unchanged")
+                return
+            resp.raise_for_status()
+
+            page = PUB_PAGE_ADAPTER.validate_json(resp.content)
+            pubs = list(page.results)
+            if page.next:
+                # Only the first page is conditional, the rest are fetched if it has changed.
+                endpoint = self._api_client.get_relative_endpoint(page.next)
+                pubs += [pub async for pub in self._api_client.paginate(PUB_PAGE_ADAPTER, endpoint)]
+            self._pubs = {pub.id: pub for pub in pubs}
+            self._etag = resp.headers.get("ETag")
+            self._last_modified = resp.headers.get("Last-Modified")
+            LOGGER.info(f"Loaded {len(pubs)} pubs into the catalogue")
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_interval)
+            try:
+                await self.revalidate()
+            except Exception:
+                # Keep refreshing whatever went wrong, e.g. a response that fails validation.
+                LOGGER.exception("Unable to refresh the pub catalogue")
+
+
 class FerryAPI:
-    def __init__(self, api_url: str, api_key: str) -> None:
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str,
+        *,
+        cache_config: FerryCacheConfig | None = None,
+        transport_config: FerryTransportConfig | None = None,
+        resilience_config: FerryResilienceConfig | None = None,
+        member_resolver: Callable[[int], Awaitable[discord.Member | None]] | None = None,
+    ) -> None:
         self._api_url = api_url
         self._api_key = api_key
+        self._member_resolver = member_resolver
+
+        transport_config = transport_config or FerryTransportConfig()
+        self._client = self._build_client(transport_config)
+        self._limiter = PriorityLimiter(transport_config.max_concurrent_requests)
+
+        resilience_config = resilience_config or FerryResilienceConfig()
+        self._retry_policy = RetryPolicy(
+            resilience_config.max_retries,
+            resilience_config.backoff_base,
+            resilience_config.backoff_max,
+            resilience_config.retry_after_max,
+        )
+        self.circuit_breaker = CircuitBreaker(
+            resilience_config.breaker_failure_threshold,
+            resilience_config.breaker_reset_timeout,
+        )
 
-        self._client = httpx.AsyncClient()
+        cache_config = cache_config or FerryCacheConfig()
+        self.person_cache: TTLCache[int, PersonSchema] = TTLCache(
+            "person", cache_config.person_maxsize, cache_config.person_ttl
+        )
+        self._person_lookups: SingleFlight[int, PersonSchema] = SingleFlight("person")
+        self._gets: SingleFlight[Hashable, Any] = SingleFlight("ferry_get")
+        self.pub_event_cache: TTLCache[int, PubEventSchema] = TTLCache(
+            "pub_event", cache_config.pub_event_maxsize, cache_config.pub_event_ttl
+        )
+        self._pub_event_discord_ids: dict[UUID, int] = {}
+        self.pubs = PubCatalogue(self, cache_config.pub_refresh_interval)
+
+    def _build_client(self, config: FerryTransportConfig) -> httpx.AsyncClient:
+        http2 = config.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            LOGGER.warning("HTTP/2 was requested but the h2 package is not installed")
+            http2 = False
+
+        encodings = []
+        if config.compression:
+            if config.brotli:
+                if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+                    encodings.append("br")
+                else:
+                    LOGGER.warning("Brotli was requested but no brotli package is installed")
+            encodings += ["gzip", "deflate"]
+
+        return httpx.AsyncClient(
+            base_url=self._api_url,
+            headers={
+                "Accept": "application/json",
+                "Accept-Encoding": ", ".join(encodings) or "identity",
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self._api_key}",
+            },
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                connect=config.connect_timeout,
+                read=config.read_timeout,
+                write=config.write_timeout,
+                pool=config.pool_timeout,
+            ),
+            http2=http2,
+        )
 
-    async def _request(
-        self, method: str, endpoint: str, *, if_404_then_none: bool = False, **kwargs
-    ) -> Any:
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self._api_key}",
-        }
+    async def aclose(self) -> None:
+        await self.pubs.close()
+        await self._client.aclose()
+
+    def get_relative_endpoint(self, url: str) -> str:
+        # Links to further pages are absolute, but metrics are labelled by endpoint.
+        return url.removeprefix(str(self._client.base_url))
+
+    def paginate(
+        self, adapter: TypeAdapter[PageSchema[T]], endpoint: str, *, max_items: int | None = None
+    ) -> Paginator[T]:
+        return Paginator(self, adapter, endpoint, max_items=max_items)
+
+    async def _send(
+        self, method: str, endpoint: str, *, headers: dict[str, str] | None = None, **kwargs
+    ) -> httpx.Response:
         LOGGER.info(f"{method} {endpoint} -> {kwargs}")
-        resp = await self._client.request(
-            method, self._api_url + endpoint, headers=headers, **kwargs
+        attempt = 0
+        while True:
+            self.circuit_breaker.before_request()
+            try:
+                # Slots are held per attempt, so nobody waits behind a backoff.
+                async with self._limiter.acquire(get_lane()):
+                    resp = await self._send_once(method, endpoint, headers=headers, **kwargs)
+            except httpx.TransportError as exc:
+                self.circuit_breaker.record_failure()
+                if not self._retry_policy.should_retry_error(method, exc, attempt):
+                    raise
+                delay = self._retry_policy.get_delay(attempt)
+                LOGGER.warning(f"{method} {endpoint} failed with {exc!r}, retrying in {delay:.2f}s")
+            else:
+                if resp.status_code >= 500:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+
+                if not self._retry_policy.should_retry_response(method, resp, attempt):
+                    return resp
+                delay = self._retry_policy.get_delay(attempt, resp)
+                LOGGER.warning(
+                    f"{method} {endpoint} -> {resp.status_code}, retrying in {delay:.2f}s"
+                )
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _send_once(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        labels = {"method": method, "endpoint": template_endpoint(endpoint)}
+        start = time.perf_counter()
+        status = "error"
+        try:
+            with REQUESTS_IN_FLIGHT.track_inprogress():
+                resp = await self._client.request(method, endpoint, **kwargs)
+            status = str(resp.status_code)
+            return resp
+        finally:
+            REQUEST_DURATION.observe(time.perf_counter() - start, **labels)
+            RESPONSES.inc(status=status, **labels)
+
+    async def _coalesce(self, key: Hashable, endpoint: str, func: Callable[[], Awaitable[T]]) -> T:
+        # Identical GETs in flight at the same time share one request. Nothing is kept once it
+        # completes, so this is safe even for data that must not be stale.
+        # Requests only share with the same lane, so interactive ones never wait as background.
+        key = (get_lane(), key)
+        if self._gets.is_running(key):
+            REQUESTS_COLLAPSED.inc(endpoint=template_endpoint(endpoint))
+        return await self._gets.run(key, func)
+
+    async def _request_content(
+        self, method: str, endpoint: str, *, if_404_then_none: bool = False, **kwargs
+    ) -> bytes | None:
+        if method == "GET" and not kwargs:
+            return await self._coalesce(
+                ("content", endpoint, if_404_then_none),
+                endpoint,
+                lambda: self._fetch_content(method, endpoint, if_404_then_none=if_404_then_none),
+            )
+        return await self._fetch_content(
+            method, endpoint, if_404_then_none=if_404_then_none, **kwargs
         )
+
+    async def _fetch_content(
+        self, method: str, endpoint: str, *, if_404_then_none: bool = False, **kwargs
+    ) -> bytes | None:
+        resp = await self._send(method, endpoint, **kwargs)
         if if_404_then_none and resp.status_code == 404:
             return None
 
@@ -156,47 +506,138 @@ class FerryAPI:
             LOGGER.error(resp.content)
             raise
 
-        data = resp.json()
-        LOGGER.info(f"{method} {endpoint} -> {resp.status_code} {data} ")
-        return data
+        LOGGER.info(f"{method} {endpoint} -> {resp.status_code} ({len(resp.content)} bytes)")
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(f"{method} {endpoint} -> {resp.text}")
+        return resp.content
+
+    async def _request_as(self, adapter: TypeAdapter[T], method: str, endpoint: str, **kwargs) -> T:
+        if method == "GET" and not kwargs:
+            # Callers of the same GET share the decoded result, not just the response.
+            return await self._coalesce(
+                ("model", id(adapter), endpoint),
+                endpoint,
+                lambda: self._decode_as(adapter, method, endpoint),
+            )
+        return await self._decode_as(adapter, method, endpoint, **kwargs)
+
+    async def _decode_as(self, adapter: TypeAdapter[T], method: str, endpoint: str, **kwargs) -> T:
+        # Validate the body as it arrived, rather than decoding it to dicts first.
+        content = await self._request_content(method, endpoint, **kwargs)
+        assert content is not None
+        return adapter.validate_json(content)
 
     async def get_current_user(self) -> UserSchema:
-        data = await self._request("GET", "v2/users/me/")
-        return UserSchema.model_validate(data)
+        return await self._request_as(USER_ADAPTER, "GET", "v2/users/me/")
 
     async def get_leaderboard(
         self,
     ) -> list[PersonWithScoreSchema]:
-        data = await self._request("GET", "v2/people/?ordering=-current_score&limit=10")
-        ta = TypeAdapter(list[PersonWithScoreSchema])
-        return ta.validate_python(data["results"])
+        paginator = self.paginate(
+            PERSON_WITH_SCORE_PAGE_ADAPTER,
+            "v2/people/?ordering=-current_score&limit=10",
+            max_items=10,
+        )
+        return [person async for person in paginator]
 
     async def get_person(self, person_id: UUID) -> PersonSchema:
-        data = await self._request("GET", f"v2/people/{person_id}/")
-        return PersonSchema.model_validate(data)
+        return await self._request_as(PERSON_ADAPTER, "GET", f"v2/people/{person_id}/")
 
     async def get_person_for_discord_member(
         self, member: discord.User | discord.Member
     ) -> PersonSchema:
-        try:
-            data = await self._request("GET", f"v2/people/?discord_id={member.id}")
-        except httpx.HTTPStatusError as exc:
-            raise exc
+        if person := self.person_cache.get(member.id):
+            return person
 
-        ta = TypeAdapter(list[PersonSchema])
-        try:
-            return ta.validate_python(data["results"])[0]
-        except IndexError:
-            pass
+        # Concurrent lookups for the same member share a request, so we never create them twice.
+        person = await self._person_lookups.run(
+            member.id, lambda: self._fetch_or_create_person(member)
+        )
+        self.person_cache.set(member.id, person)
+        return person
+
+    async def get_people_for_discord_ids(
+        self,
+        discord_ids: Iterable[int],
+        *,
+        users: Mapping[int, discord.User | discord.Member] | None = None,
+        chunk_size: int = 50,
+    ) -> dict[int, PersonSchema]:
+        """Get the people for many Discord users, creating any that don't exist yet.
+
+        People are created from the given users, or from the guild member if they aren't
+        given. Discord ids that are neither are left out of the result.
+        """
+        people: dict[int, PersonSchema] = {}
+        missing: list[int] = []
+        for discord_id in dict.fromkeys(discord_ids):
+            if person := self.person_cache.get(discord_id):
+                people[discord_id] = person
+            else:
+                missing.append(discord_id)
+
+        async with asyncio.TaskGroup() as tg:
+            for i in range(0, len(missing), chunk_size):
+                tg.create_task(self._fetch_people(missing[i : i + chunk_size], people))
+
+        to_create = [discord_id for discord_id in missing if discord_id not in people]
+        async with asyncio.TaskGroup() as tg:
+            creations = {
+                discord_id: tg.create_task(
+                    self._create_person_for_discord_id(discord_id, (users or {}).get(discord_id))
+                )
+                for discord_id in to_create
+            }
+        for discord_id, creation in creations.items():
+            if (person := creation.result()) is not None:
+                people[discord_id] = person
+
+        for discord_id in missing:
+            if person := people.get(discord_id):
+                self.person_cache.set(discord_id, person)
+        return people
+
+    async def _fetch_people(self, discord_ids: list[int], people: dict[int, PersonSchema]) -> None:
+        query = urlencode([("discord_id", discord_id) for discord_id in discord_ids])
+        async for person in self.paginate(PERSON_PAGE_ADAPTER, f"v2/people/?{query}"):
+            if person.discord_id is not None:
+                people[person.discord_id] = person
+
+    async def _create_person_for_discord_id(
+        self, discord_id: int, user: discord.User | discord.Member | None
+    ) -> PersonSchema | None:
+        if user is None and self._member_resolver is not None:
+            try:
+                user = await self._member_resolver(discord_id)
+            except discord.HTTPException:
+                LOGGER.exception(f"Unable to fetch member {discord_id}")
+        if user is None:
+            LOGGER.warning(f"Unable to create a person for {discord_id}, they are not a member")
+            return None
+        # Share the request with any single lookup for the same user.
+        return await self._person_lookups.run(discord_id, lambda: self._create_person(user))
+
+    async def _fetch_or_create_person(self, member: discord.User | discord.Member) -> PersonSchema:
+        paginator = self.paginate(PERSON_PAGE_ADAPTER, f"v2/people/?discord_id={member.id}")
+        if person := await paginator.first():
+            return person
+        return await self._create_person(member)
+
+    async def _create_person(self, member: discord.User | discord.Member) -> PersonSchema:
+        # Users from events without member data don't have their server nickname, so fetch
+        # the member, but only when they are new to us.
+        if not isinstance(member, discord.Member) and self._member_resolver is not None:
+            try:
+                member = await self._member_resolver(member.id) or member
+            except discord.HTTPException:
+                LOGGER.warning(f"Unable to fetch member {member.id}, using their global name")
 
         LOGGER.info(f"Creating new person for {member}")
         payload = {"display_name": member.display_name, "discord_id": member.id}
-        data = await self._request("POST", "v2/people/", json=payload)
-        return PersonSchema.model_validate(data)
+        return await self._request_as(PERSON_ADAPTER, "POST", "v2/people/", json=payload)
 
     async def get_fact_for_person(self, person_id: UUID) -> FactSchema:
-        data = await self._request("GET", f"v2/people/{person_id}/fact/")
-        return FactSchema.model_validate(data)
+        return await self._request_as(FACT_ADAPTER, "GET", f"v2/people/{person_id}/fact/")
 
     async def create_accusation(
         self, created_by: UUID, suspect: UUID, quote: str
@@ -206,12 +647,14 @@ class FerryAPI:
             "suspect": str(suspect),
             "created_by": str(created_by),
         }
-        data = await self._request("POST", "v2/court/accusations/", json=payload)
-        return AccusationSchema.model_validate(data)
+        return await self._request_as(
+            ACCUSATION_ADAPTER, "POST", "v2/court/accusations/", json=payload
+        )
 
     async def get_accusation(self, accusation_id: UUID) -> AccusationSchema:
-        data = await self._request("GET", f"v2/court/accusations/{accusation_id}/")
-        return AccusationSchema.model_validate(data)
+        return await self._request_as(
+            ACCUSATION_ADAPTER, "GET", f"v2/court/accusations/{accusation_id}/"
+        )
 
     async def create_ratification(
         self, accusation_id: UUID, created_by: UUID
@@ -219,26 +662,36 @@ class FerryAPI:
         payload = {
             "created_by": str(created_by),
         }
-        data = await self._request(
-            "POST", f"v2/court/accusations/{accusation_id}/ratification/", json=payload
+        return await self._request_as(
+            RATIFICATION_ADAPTER,
+            "POST",
+            f"v2/court/accusations/{accusation_id}/ratification/",
+            json=payload,
         )
-        return RatificationSchema.model_validate(data)
 
     async def get_pubs(
         self,
     ) -> list[PubSchema]:
-        data = await self._request("GET", "v2/pub/pubs/")
-        ta = TypeAdapter(list[PubSchema])
-        return ta.validate_python(data["results"])
+        if not self.pubs.loaded:
+            await self.pubs.revalidate()
+        return self.pubs.get_all()
 
     async def get_pub(
         self,
         pub_id: UUID,
     ) -> PubSchema | None:
-        data = await self._request("GET", f"v2/pub/pubs/{pub_id}/", if_404_then_none=True)
-        if data is None:
+        if cached := self.pubs.get(pub_id):
+            return cached
+
+        # Either the catalogue isn't loaded yet, or the pub was added since it was last refreshed.
+        content = await self._request_content(
+            "GET", f"v2/pub/pubs/{pub_id}/", if_404_then_none=True
+        )
+        if content is None:
             return None
-        return PubSchema.model_validate(data)
+        pub = PUB_ADAPTER.validate_json(content)
+        self.pubs.add(pub)
+        return pub
 
     async def create_pub_event(
         self,
@@ -246,7 +699,7 @@ class FerryAPI:
         pub_id: UUID,
         created_by: UUID,
         scheduled_event_id: int,
-    ) -> None:
+    ) -> PubEventSchema:
         payload = {
             "timestamp": timestamp.isoformat(),
             "pub": str(pub_id),
@@ -254,7 +707,11 @@ class FerryAPI:
             "table": None,
             "created_by": str(created_by),
         }
-        await self._request("POST", "v2/pub/events/", json=payload)
+        pub_event = await self._request_as(
+            PUB_EVENT_ADAPTER, "POST", "v2/pub/events/", json=payload
+        )
+        self._store_pub_event(pub_event)
+        return pub_event
 
     async def update_pub_event(
         self,
@@ -271,55 +728,90 @@ class FerryAPI:
         if pub_id is not None:
             payload["pub"] = str(pub_id)
 
-        data = await self._request("PATCH", f"v2/pub/events/{event_id}/", json=payload)
-        return PubEventSchema.model_validate(data)
+        pub_event = await self._request_as(
+            PUB_EVENT_ADAPTER, "PATCH", f"v2/pub/events/{event_id}/", json=payload
+        )
+        self._store_pub_event(pub_event)
+        return pub_event
 
-    async def get_pub_event_by_discord_id(self, scheduled_event_id: int) -> PubEventSchema | None:
-        try:
-            data = await self._request("GET", f"v2/pub/events/?discord_id={scheduled_event_id}")
-        except httpx.HTTPStatusError as exc:
-            raise exc
+    def _store_pub_event(self, pub_event: PubEventSchema) -> None:
+        if pub_event.discord_id is not None:
+            self.pub_event_cache.set(pub_event.discord_id, pub_event)
+            self._pub_event_discord_ids[pub_event.id] = pub_event.discord_id
 
-        ta = TypeAdapter(list[PubEventSchema])
+    def _invalidate_pub_event(self, pub_event_id: UUID) -> None:
+        if (scheduled_event_id := self._pub_event_discord_ids.pop(pub_event_id, None)) is not None:
+            self.pub_event_cache.invalidate(scheduled_event_id)
+
+    def _store_pub_event_response(self, pub_event_id: UUID, content: bytes | None) -> None:
         try:
-            return ta.validate_python(data["results"])[0]
-        except IndexError:
+            pub_event = PUB_EVENT_ADAPTER.validate_json(content or b"")
+        except ValidationError:
+            # The response didn't include the event, so fetch it again next time it's needed.
+            self._invalidate_pub_event(pub_event_id)
+        else:
+            self._store_pub_event(pub_event)
+
+    async def get_pub_event_by_discord_id(
+        self, scheduled_event_id: int, *, use_cache: bool = True
+    ) -> PubEventSchema | None:
+        if use_cache and (pub_event := self.pub_event_cache.get(scheduled_event_id)):
+            return pub_event
+
+        paginator = self.paginate(
+            PUB_EVENT_PAGE_ADAPTER, f"v2/pub/events/?discord_id={scheduled_event_id}"
+        )
+        if (pub_event := await paginator.first()) is None:
             return None
+        self._store_pub_event(pub_event)
+        return pub_event
 
     async def add_attendee_to_pub_event(self, pub_event_id: UUID, person_id: UUID) -> None:
         payload = {
             "person": str(person_id),
         }
         try:
-            await self._request(
+            content = await self._request_content(
                 "POST", f"v2/pub/events/{pub_event_id}/attendees/add/", json=payload
             )
-        except httpx.HTTPStatusError as exc:
-            LOGGER.exception(exc)
+        except httpx.HTTPStatusError:
+            self._invalidate_pub_event(pub_event_id)
+            raise
+        else:
+            self._store_pub_event_response(pub_event_id, content)
 
     async def remove_attendee_from_pub_event(
         self, pub_event_id: UUID, person_id: UUID
-    ) -> PubEventSchema | None:
+    ) -> PubEventSchema:
         payload = {
             "person": str(person_id),
         }
         try:
-            data = await self._request(
-                "POST", f"v2/pub/events/{pub_event_id}/attendees/remove/", json=payload
+            pub_event = await self._request_as(
+                PUB_EVENT_ADAPTER,
+                "POST",
+                f"v2/pub/events/{pub_event_id}/attendees/remove/",
+                json=payload,
             )
-            return PubEventSchema.model_validate(data)
-        except httpx.HTTPStatusError as exc:
-            LOGGER.exception(exc)
-            return None
+        except httpx.HTTPStatusError:
+            self._invalidate_pub_event(pub_event_id)
+            raise
+        self._store_pub_event(pub_event)
+        return pub_event
 
     async def update_table_for_pub_event(self, pub_event_id: UUID, table_number: int) -> None:
         payload = {
             "table_number": table_number,
         }
         try:
-            await self._request("POST", f"v2/pub/events/{pub_event_id}/table/", json=payload)
-        except httpx.HTTPStatusError as exc:
-            LOGGER.exception(exc)
+            content = await self._request_content(
+                "POST", f"v2/pub/events/{pub_event_id}/table/", json=payload
+            )
+        except httpx.HTTPStatusError:
+            self._invalidate_pub_event(pub_event_id)
+            raise
+        else:
+            self._store_pub_event_response(pub_event_id, content)
 
     async def create_pub_booking(
         self, pub_event_id: UUID, table_size: int, created_by: UUID
@@ -329,11 +821,11 @@ class FerryAPI:
             "created_by": str(created_by),
         }
         try:
-            data = await self._request(
-                "POST", f"v2/pub/events/{pub_event_id}/booking/", json=payload
-            )
             # The API returns a full PubEventSchema, extract the booking
-            event = PubEventSchema.model_validate(data)
+            event = await self._request_as(
+                PUB_EVENT_ADAPTER, "POST", f"v2/pub/events/{pub_event_id}/booking/", json=payload
+            )
+            self._store_pub_event(event)
             if event.booking is None:
                 raise ValueError("Booking was created but is None in response")
             return event.booking
@@ -348,8 +840,12 @@ class FerryAPI:
             "person": str(person_id),
         }
         try:
-            data = await self._request("POST", "v2/pub/events/tombstones/", json=payload)
-            return PubEventTombstoneSchema.model_validate(data)
+            tombstone = await self._request_as(
+                PUB_EVENT_TOMBSTONE_ADAPTER, "POST", "v2/pub/events/tombstones/", json=payload
+            )
+            if tombstone.pub_event is not None:
+                self._invalidate_pub_event(tombstone.pub_event)
+            return tombstone
         except httpx.HTTPStatusError as exc:
             if exc.response.status_code == 409:
                 LOGGER.warning(f"Tombstone already exists for person {person_id}")
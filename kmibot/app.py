@@ -21,6 +21,11 @@ async def run(client: DiscordClient, token: str) -> None:
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("-c", "--config", type=str, default="config.toml")
+    parser.add_argument(
+        "--force-sync",
+        action="store_true",
+        help="Sync app commands with Discord even if they have not changed.",
+    )
     return parser.parse_args()
 
 
@@ -37,7 +42,7 @@ def app() -> None:
         return
 
     try:
-        client = DiscordClient(config)
+        client = DiscordClient(config, force_sync=args.force_sync)
         asyncio.run(run(client, config.discord.token))
     except KeyboardInterrupt:
         pass
@@ -0,0 +1,86 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+from . import metrics
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+CACHE_LOOKUPS = metrics.counter(
+    "kmibot_cache_lookups_total",
+    "Cache lookups by result.",
+    ["cache", "result"],
+)
+SINGLE_FLIGHT_COLLAPSED = metrics.counter(
+    "kmibot_single_flight_collapsed_total",
+    "Calls that shared an identical call already in flight.",
+    ["name"],
+)
+
+
+class TTLCache(Generic[K, V]):
+    """A bounded mapping whose entries expire, evicting the least recently used first."""
+
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        try:
+            expires_at, value = self._data[key]
+        except KeyError:
+            CACHE_LOOKUPS.inc(cache=self.name, result="miss")
+            return None
+
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            CACHE_LOOKUPS.inc(cache=self.name, result="miss")
+            return None
+
+        self._data.move_to_end(key)
+        CACHE_LOOKUPS.inc(cache=self.name, result="hit")
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class SingleFlight(Generic[K, V]):
+    """Share one in-flight call between concurrent callers using the same key."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._inflight: dict[K, asyncio.Future[V]] = {}
+
+    def is_running(self, key: K) -> bool:
+        return key in self._inflight
+
+    async def run(self, key: K, func: Callable[[], Awaitable[V]]) -> V:
+        if (future := self._inflight.get(key)) is not None:
+            SINGLE_FLIGHT_COLLAPSED.inc(name=self.name)
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(func())
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield the shared call so that one cancelled caller doesn't cancel it for the others.
+        return await asyncio.shield(future)
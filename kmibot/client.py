@@ -1,29 +1,164 @@
 import asyncio
+import hashlib
+import json
 import logging
+import resource
+import time
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import Any, TypeVar, cast
 
 import discord
 from discord import app_commands
 
-
+from . import metrics
 from .api import FerryAPI
 from .config import BotConfig
+from .dispatcher import EventDispatcher
+from .interactions import InteractionDeadline, respond
+from .journal import WriteJournal
+from .lanes import Lane, set_lane
+from .members import MemberResolver
 from .modules import MODULES, Module
+from .outbound import OutboundQueue
+from .routing import EventRouter
 
 LOGGER = logging.getLogger(__name__)
 
+M = TypeVar("M", bound=Module)
+
+APP_COMMAND_DURATION = metrics.histogram(
+    "kmibot_app_command_duration_seconds",
+    "Time taken to handle app commands.",
+    ["command", "outcome"],
+)
+APP_COMMANDS_IN_FLIGHT = metrics.gauge(
+    "kmibot_app_commands_in_flight",
+    "App commands currently being handled.",
+)
+
+
+def _observe_app_command(interaction: discord.Interaction, outcome: str) -> None:
+    if (deadline := interaction.extras.pop("deadline", None)) is not None:
+        deadline.stop()
+    if (started_at := interaction.extras.pop("started_at", None)) is None:
+        return
+    APP_COMMANDS_IN_FLIGHT.dec()
+    command = interaction.command.qualified_name if interaction.command else "unknown"
+    APP_COMMAND_DURATION.observe(time.perf_counter() - started_at, command=command, outcome=outcome)
+
+
+class CommandTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction, /) -> bool:
+        interaction.extras["started_at"] = time.perf_counter()
+        APP_COMMANDS_IN_FLIGHT.inc()
+        # The command runs in the same task, so its Ferry API requests skip background work.
+        set_lane(Lane.INTERACTIVE)
+
+        # Commands can set extras={"defer_ephemeral": False} if their reply is public, or
+        # extras={"deadline": False} if they must not be deferred.
+        command = interaction.command
+        if command is not None and not command.extras.get("deadline", True):
+            return True
+        deadline = InteractionDeadline(
+            interaction,
+            name=command.qualified_name if command else "unknown",
+            budget=cast("DiscordClient", self.client).config.interactions.defer_after,
+            ephemeral=command.extras.get("defer_ephemeral", True) if command else True,
+            thinking=True,
+        )
+        deadline.start()
+        interaction.extras["deadline"] = deadline
+        return True
+
+    async def on_error(
+        self, interaction: discord.Interaction, error: app_commands.AppCommandError, /
+    ) -> None:
+        # Commands are deferred with thinking=True, so without a reply the user is left
+        # watching "Bot is thinking..." until the interaction expires.
+        deadline = interaction.extras.get("deadline")
+        if isinstance(deadline, InteractionDeadline):
+            replied = deadline.replied
+        else:
+            replied = interaction.response.is_done()
+        if not replied:
+            try:
+                await respond(interaction, "Sorry, something went wrong.", ephemeral=True)
+            except discord.HTTPException:
+                LOGGER.exception("Unable to report an app command error")
+
+        _observe_app_command(interaction, "error")
+        await super().on_error(interaction, error)
+
 
 class DiscordClient(discord.Client):
-    def __init__(self, config: BotConfig) -> None:
-        super().__init__(intents=self.intents)
+    def __init__(self, config: BotConfig, *, force_sync: bool = False) -> None:
+        super().__init__(
+            intents=self.intents,
+            member_cache_flags=self._get_member_cache_flags(config),
+            chunk_guilds_at_startup=config.discord.chunk_guilds_at_startup,
+        )
 
         self.config = config
+        self._force_sync = force_sync
+        self._started_at: float | None = time.perf_counter()
+        self._synced_commands = False
         self.guild: discord.Object | discord.Guild = discord.Object(config.discord.guild_id)
-        self.tree = app_commands.CommandTree(self)
-        self.api_client = FerryAPI(self.config.ferry.api_url, self.config.ferry.api_key)
+        self.tree = CommandTree(self)
+        self.members = MemberResolver(
+            self,
+            config.discord.guild_id,
+            config.discord.fetched_member_maxsize,
+            config.discord.fetched_member_ttl,
+        )
+        self._member_lookups: set[asyncio.Task[None]] = set()
+        for event in ("scheduled_event_user_add", "scheduled_event_user_remove"):
+            parser = f"GUILD_{event.upper()}"
+            self._connection.parsers[parser] = partial(
+                self._parse_scheduled_event_user, event, self._connection.parsers[parser]
+            )
+        self.api_client = FerryAPI(
+            self.config.ferry.api_url,
+            self.config.ferry.api_key,
+            cache_config=self.config.ferry.cache,
+            transport_config=self.config.ferry.transport,
+            resilience_config=self.config.ferry.resilience,
+            member_resolver=self.members.get,
+        )
+        self.metrics_server: metrics.MetricsServer | None = None
+        if config.metrics.enabled:
+            self.metrics_server = metrics.MetricsServer(config.metrics.host, config.metrics.port)
+
+        self.dispatcher = EventDispatcher(
+            concurrency=config.dispatcher.concurrency,
+            max_queue_size=config.dispatcher.max_queue_size,
+        )
+
+        self.router = EventRouter()
+        self.outbound = OutboundQueue(
+            workers=config.outbound.workers,
+            max_reactions_queued=config.outbound.max_reactions_queued,
+        )
+        self.journal = WriteJournal(
+            config.journal.path,
+            retry_base=config.journal.retry_base,
+            retry_max=config.journal.retry_max,
+            max_attempts=config.journal.max_attempts,
+            max_age=config.journal.max_age,
+        )
 
         self._modules: list[Module] = [module_cls(self, self.api_client) for module_cls in MODULES]
+        for module in self._modules:
+            self.dispatcher.register(type(module).__name__)
+            self.router.add(type(module).__name__, module.get_subscriptions())
         LOGGER.info(f"Set up {len(self._modules)} modules")
 
+    def get_module(self, module_cls: type[M]) -> M:
+        for module in self._modules:
+            if isinstance(module, module_cls):
+                return module
+        raise LookupError(f"{module_cls.__name__} is not enabled")
+
     @property
     def intents(self) -> discord.Intents:
         intents = discord.Intents.default()
@@ -32,15 +167,145 @@ class DiscordClient(discord.Client):
         intents.guild_scheduled_events = True
         return intents
 
+    @staticmethod
+    def _get_member_cache_flags(config: BotConfig) -> discord.MemberCacheFlags:
+        # Members that aren't cached are fetched when needed, see MemberResolver.
+        match config.discord.member_cache:
+            case "all":
+                return discord.MemberCacheFlags.all()
+            case "joined":
+                return discord.MemberCacheFlags(joined=True)
+            case _:
+                return discord.MemberCacheFlags.none()
+
+    def _parse_scheduled_event_user(
+        self, event: str, parse: Callable[[dict[str, Any]], None], data: dict[str, Any]
+    ) -> None:
+        user_id = int(data["user_id"])
+        guild = self.get_guild(int(data["guild_id"]))
+        scheduled_event = (
+            guild.get_scheduled_event(int(data["guild_scheduled_event_id"])) if guild else None
+        )
+        if self.get_user(user_id) is not None or scheduled_event is None:
+            parse(data)
+            return
+
+        # discord.py drops RSVPs from users it hasn't cached, which is most of them unless
+        # members were chunked at startup, so fetch the member and dispatch the event ourselves.
+        task = asyncio.create_task(self._dispatch_with_member(event, scheduled_event, user_id))
+        self._member_lookups.add(task)
+        task.add_done_callback(self._member_lookups.discard)
+
+    async def _dispatch_with_member(
+        self, event: str, scheduled_event: discord.ScheduledEvent, user_id: int
+    ) -> None:
+        try:
+            member = await self.members.get(user_id)
+        except discord.HTTPException:
+            LOGGER.exception(f"Unable to fetch member {user_id} for {event}")
+            return
+        if member is None:
+            LOGGER.warning(f"Ignoring {event} from {user_id}, they are not a member")
+            return
+        self.dispatch(event, scheduled_event, member)
+
     async def setup_hook(self) -> None:
+        if self.metrics_server is not None:
+            await self.metrics_server.start()
+
+        self.dispatcher.start()
+        self.outbound.start()
+        await self.journal.open()
+
+        for module in self._modules:
+            await module.setup_hook(self)
+
+        self._synced_commands = await self._sync_commands()
+
+    def _get_command_tree_fingerprint(self) -> str:
+        commands = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands(guild=self.guild)),
+            key=lambda command: (command["type"], command["name"]),
+        )
+        payload = {
+            "application_id": self.application_id,
+            "guild_id": self.guild.id,
+            "commands": commands,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    async def _sync_commands(self) -> bool:
+        # Syncing is a rate limited bulk overwrite, so only do it when the commands change.
+        path = self.config.discord.command_fingerprint_path
+        fingerprint = self._get_command_tree_fingerprint()
+        if not self._force_sync:
+            try:
+                if path.read_text().strip() == fingerprint:
+                    LOGGER.info("App commands are unchanged, skipping sync")
+                    return False
+            except FileNotFoundError:
+                pass
+
         # Sync the application command with Discord.
         LOGGER.info("Synchronising app commands")
         commands = await self.tree.sync(guild=self.guild)
         for command in commands:
             LOGGER.info(f"Registered /{command.name}")
 
+        try:
+            path.write_text(f"{fingerprint}\n")
+        except OSError as exc:
+            LOGGER.warning(f"Unable to save the app command fingerprint: {exc}")
+        return True
+
+    async def close(self) -> None:
+        # Let queued handlers finish while we still have a connection to Discord.
+        await self.dispatcher.drain(self.config.dispatcher.drain_timeout)
+        # Anything not replayed in time stays in the journal for next time.
+        await self.journal.close(self.config.journal.drain_timeout)
+        for module in self._modules:
+            await module.close(self)
+        await self.outbound.close(self.config.outbound.drain_timeout)
+        await super().close()
+        await self.api_client.aclose()
+        if self.metrics_server is not None:
+            await self.metrics_server.close()
+
+    def _dispatch_to_modules(
+        self, event: str, get_handler: Callable[[Module], Awaitable[None]]
+    ) -> None:
+        for module in self._modules:
+            self.dispatcher.submit(type(module).__name__, event, partial(get_handler, module))
+
+    def _route(self, event: str, channel_id: int, author: discord.abc.User, *args: object) -> None:
+        for route in self.router.match(event, channel_id, author):
+            self.dispatcher.submit(
+                route.module_name, event, partial(route.subscription.handler, *args)
+            )
+
+    async def on_app_command_completion(
+        self,
+        interaction: discord.Interaction,
+        command: app_commands.Command | app_commands.ContextMenu,
+    ) -> None:
+        _observe_app_command(interaction, "success")
+
     async def on_ready(self) -> None:
         LOGGER.info(f"Logged on as {self.user}!")
+        if self._started_at is not None:
+            sync = "synced" if self._synced_commands else "not synced"
+            LOGGER.info(
+                f"Ready {time.perf_counter() - self._started_at:.2f}s after starting "
+                f"(app commands {sync})"
+            )
+            # ru_maxrss is in KiB on Linux.
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            LOGGER.info(
+                f"Caching {len(self.users)} users (member cache: "
+                f"{self.config.discord.member_cache}, chunked at startup: "
+                f"{self.config.discord.chunk_guilds_at_startup}), max RSS {max_rss:.1f} MiB"
+            )
+            self._started_at = None
 
         if len(guilds := [guild async for guild in self.fetch_guilds()]) != 1:
             raise RuntimeError(
@@ -49,16 +314,24 @@ class DiscordClient(discord.Client):
         self.guild = guilds[0]
         LOGGER.info(f"Guild: {self.guild}")
 
-        for module in self._modules:
-            asyncio.create_task(module.on_ready(self))
+        # Replaying may post to channels, so wait until they are cached.
+        self.journal.start()
+
+        self._dispatch_to_modules("ready", lambda module: module.on_ready(self))
+
+    async def on_resumed(self) -> None:
+        LOGGER.info("Resumed the gateway session")
+        self._dispatch_to_modules("resumed", lambda module: module.on_resumed(self))
 
     async def on_scheduled_event_create(
         self,
         event: discord.ScheduledEvent,
     ) -> None:
         LOGGER.info(f"Received create for scheduled event: {event.name}")
-        for module in self._modules:
-            asyncio.create_task(module.on_scheduled_event_create(self, event))
+        self._dispatch_to_modules(
+            "scheduled_event_create",
+            lambda module: module.on_scheduled_event_create(self, event),
+        )
 
     async def on_scheduled_event_update(
         self,
@@ -66,19 +339,41 @@ class DiscordClient(discord.Client):
         new_event: discord.ScheduledEvent,
     ) -> None:
         LOGGER.info(f"Received update for scheduled event: {old_event.name}")
-        for module in self._modules:
-            asyncio.create_task(module.on_scheduled_event_update(self, old_event, new_event))
+        self._dispatch_to_modules(
+            "scheduled_event_update",
+            lambda module: module.on_scheduled_event_update(self, old_event, new_event),
+        )
+
+    async def on_scheduled_event_delete(
+        self,
+        event: discord.ScheduledEvent,
+    ) -> None:
+        LOGGER.info(f"Received delete for scheduled event: {event.name}")
+        self._dispatch_to_modules(
+            "scheduled_event_delete",
+            lambda module: module.on_scheduled_event_delete(self, event),
+        )
 
     async def on_scheduled_event_user_add(
         self, event: discord.ScheduledEvent, user: discord.User
     ) -> None:
         LOGGER.info(f"{user} joined {event.name}")
-        for module in self._modules:
-            asyncio.create_task(module.on_scheduled_event_user_add(self, event, user))
+        self._dispatch_to_modules(
+            "scheduled_event_user_add",
+            lambda module: module.on_scheduled_event_user_add(self, event, user),
+        )
 
     async def on_scheduled_event_user_remove(
         self, event: discord.ScheduledEvent, user: discord.User
     ) -> None:
         LOGGER.info(f"{user} left {event.name}")
-        for module in self._modules:
-            asyncio.create_task(module.on_scheduled_event_user_remove(self, event, user))
+        self._dispatch_to_modules(
+            "scheduled_event_user_remove",
+            lambda module: module.on_scheduled_event_user_remove(self, event, user),
+        )
+
+    async def on_message(self, message: discord.Message) -> None:
+        self._route("message", message.channel.id, message.author, message)
+
+    async def on_reaction_add(self, reaction: discord.Reaction, user: discord.User) -> None:
+        self._route("reaction_add", reaction.message.channel.id, user, reaction, user)
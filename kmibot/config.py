@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 from zoneinfo import ZoneInfo
 
 import tomllib
@@ -13,6 +14,11 @@ class ConfigError(Exception):
 class DiscordConfig(BaseModel):
     token: str
     guild_id: int
+    command_fingerprint_path: Path = Path(".command-tree.sha256")
+    chunk_guilds_at_startup: bool = False
+    member_cache: Literal["all", "joined", "none"] = "none"
+    fetched_member_maxsize: int = 256
+    fetched_member_ttl: float = 600
 
 
 class PubConfig(BaseModel):
@@ -23,6 +29,38 @@ class PubConfig(BaseModel):
     hour: int
     minute: int = 0
     web_url: str
+    reconcile_interval: float = 900
+
+
+class FerryCacheConfig(BaseModel):
+    person_maxsize: int = 1024
+    person_ttl: float = 600
+    pub_refresh_interval: float = 900
+    pub_event_maxsize: int = 64
+    pub_event_ttl: float = 300
+
+
+class FerryTransportConfig(BaseModel):
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30
+    connect_timeout: float = 5
+    read_timeout: float = 10
+    write_timeout: float = 5
+    pool_timeout: float = 5
+    max_concurrent_requests: int = 10
+    http2: bool = False
+    compression: bool = True
+    brotli: bool = False
+
+
+class FerryResilienceConfig(BaseModel):
+    max_retries: int = 3
+    backoff_base: float = 0.25
+    backoff_max: float = 4
+    retry_after_max: float = 30
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 30
 
 
 class FerryConfig(BaseModel):
@@ -30,7 +68,45 @@ class FerryConfig(BaseModel):
     api_key: str
     channel_id: int
     banned_word: str
+    banned_words: list[str] = []
     emoji_reacts: str
+    leaderboard_debounce: float = 10
+    leaderboard_max_age: float = 60
+    leaderboard_message_path: Path = Path(".leaderboard-message")
+    cache: FerryCacheConfig = FerryCacheConfig()
+    transport: FerryTransportConfig = FerryTransportConfig()
+    resilience: FerryResilienceConfig = FerryResilienceConfig()
+
+
+class DispatcherConfig(BaseModel):
+    concurrency: int = 4
+    max_queue_size: int = 1000
+    drain_timeout: float = 10
+
+
+class OutboundConfig(BaseModel):
+    workers: int = 4
+    max_reactions_queued: int = 100
+    drain_timeout: float = 10
+
+
+class InteractionsConfig(BaseModel):
+    defer_after: float = 2  # seconds, Discord fails interactions not acknowledged within 3
+
+
+class JournalConfig(BaseModel):
+    path: Path = Path("ferry-journal.sqlite3")
+    retry_base: float = 1
+    retry_max: float = 60
+    max_attempts: int = 10
+    max_age: float = 86400
+    drain_timeout: float = 10
+
+
+class MetricsConfig(BaseModel):
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 9100
 
 
 class BotConfig(BaseSettings):
@@ -38,6 +114,11 @@ class BotConfig(BaseSettings):
     discord: DiscordConfig
     ferry: FerryConfig
     pub: PubConfig
+    dispatcher: DispatcherConfig = DispatcherConfig()
+    outbound: OutboundConfig = OutboundConfig()
+    interactions: InteractionsConfig = InteractionsConfig()
+    journal: JournalConfig = JournalConfig()
+    metrics: MetricsConfig = MetricsConfig()
 
     class Config:
         env_nested_delimiter = "__"
@@ -0,0 +1,104 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from logging import getLogger
+
+from . import metrics
+
+LOGGER = getLogger(__name__)
+
+HANDLER_DURATION = metrics.histogram(
+    "kmibot_event_handler_duration_seconds",
+    "Time taken by module handlers for gateway events.",
+    ["event", "module"],
+)
+HANDLERS_IN_FLIGHT = metrics.gauge(
+    "kmibot_event_handlers_in_flight",
+    "Module handlers for gateway events currently running.",
+    ["event", "module"],
+)
+HANDLER_ERRORS = metrics.counter(
+    "kmibot_event_handler_errors_total",
+    "Module handlers for gateway events that raised an exception.",
+    ["event", "module"],
+)
+QUEUE_DEPTH = metrics.gauge(
+    "kmibot_dispatcher_queue_depth",
+    "Gateway event handlers waiting to run.",
+    ["module"],
+)
+DROPPED = metrics.counter(
+    "kmibot_dispatcher_dropped_total",
+    "Gateway event handlers dropped because the queue was full.",
+    ["event", "module"],
+)
+
+
+@dataclass
+class Job:
+    event: str
+    handler: Callable[[], Awaitable[None]]
+
+
+class EventDispatcher:
+    """Run module event handlers from bounded per-module queues with limited concurrency."""
+
+    def __init__(self, *, concurrency: int, max_queue_size: int) -> None:
+        self._concurrency = concurrency
+        self._max_queue_size = max_queue_size
+        self._queues: dict[str, asyncio.Queue[Job]] = {}
+        self._workers: set[asyncio.Task[None]] = set()
+        self._accepting = True
+
+    def register(self, name: str) -> None:
+        self._queues[name] = asyncio.Queue(self._max_queue_size)
+        QUEUE_DEPTH.set(0, module=name)
+
+    def start(self) -> None:
+        for name, queue in self._queues.items():
+            for _ in range(self._concurrency):
+                task = asyncio.create_task(self._work(name, queue), name=f"dispatcher:{name}")
+                self._workers.add(task)
+                task.add_done_callback(self._workers.discard)
+
+    def submit(self, name: str, event: str, handler: Callable[[], Awaitable[None]]) -> bool:
+        if not self._accepting:
+            LOGGER.warning(f"Not dispatching {event} to {name}, shutting down")
+            return False
+
+        queue = self._queues[name]
+        try:
+            queue.put_nowait(Job(event, handler))
+        except asyncio.QueueFull:
+            LOGGER.error(f"Dropping {event} for {name}, {queue.qsize()} handlers already queued")
+            DROPPED.inc(event=event, module=name)
+            return False
+        QUEUE_DEPTH.set(queue.qsize(), module=name)
+        return True
+
+    async def drain(self, timeout: float) -> None:
+        self._accepting = False
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues.values())), timeout
+            )
+        except TimeoutError:
+            LOGGER.warning(f"Gave up waiting for event handlers after {timeout}s")
+
+        for task in list(self._workers):
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    async def _work(self, name: str, queue: asyncio.Queue[Job]) -> None:
+        while True:
+            job = await queue.get()
+            QUEUE_DEPTH.set(queue.qsize(), module=name)
+            labels = {"event": job.event, "module": name}
+            try:
+                with HANDLERS_IN_FLIGHT.track_inprogress(**labels), HANDLER_DURATION.time(**labels):
+                    await job.handler()
+            except Exception:
+                HANDLER_ERRORS.inc(**labels)
+                LOGGER.exception(f"Error in {name} handler for {job.event}")
+            finally:
+                queue.task_done()
@@ -0,0 +1,141 @@
+import asyncio
+from logging import getLogger
+from types import TracebackType
+from typing import Any
+
+import discord
+
+from . import metrics
+
+LOGGER = getLogger(__name__)
+
+# Discord fails an interaction that has not been acknowledged within this many seconds.
+INTERACTION_TIMEOUT = 3
+
+DEFERRALS = metrics.counter(
+    "kmibot_interaction_deferrals_total",
+    "Interactions deferred because the response was not ready within the latency budget.",
+    ["interaction"],
+)
+RESCUED = metrics.counter(
+    "kmibot_interaction_deadline_rescues_total",
+    "Deferred interactions whose response was ready after Discord's deadline, and so would have failed.",
+    ["interaction"],
+)
+
+
+class InteractionDeadline:
+    """Defer an interaction if its response is not ready within a latency budget.
+
+    Discord fails an interaction that is not acknowledged within 3 seconds. Replies
+    sent through this class go to whichever of the initial response or a followup
+    is still available, so callers do not need to know whether a deferral happened.
+    """
+
+    def __init__(
+        self,
+        interaction: discord.Interaction,
+        *,
+        name: str,
+        budget: float,
+        ephemeral: bool = False,
+        thinking: bool = False,
+    ) -> None:
+        self.interaction = interaction
+        self.name = name
+        self.budget = budget
+        self.ephemeral = ephemeral
+        self.thinking = thinking
+        self.deferred = False
+        self._replied = False
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> "InteractionDeadline":
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if (task := self._task) is not None:
+            self.stop()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._defer_after_budget())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def replied(self) -> bool:
+        return self._replied
+
+    def elapsed(self) -> float:
+        # The interaction was created before we received it, so count from its timestamp.
+        return (discord.utils.utcnow() - self.interaction.created_at).total_seconds()
+
+    def remaining(self) -> float:
+        return min(max(self.budget - self.elapsed(), 0), self.budget)
+
+    async def _defer_after_budget(self) -> None:
+        await asyncio.sleep(self.remaining())
+        async with self._lock:
+            if self.interaction.response.is_done():
+                return
+            LOGGER.info(f"Deferring {self.name}, the response is taking too long")
+            try:
+                await self.interaction.response.defer(
+                    ephemeral=self.ephemeral, thinking=self.thinking
+                )
+            except discord.HTTPException:
+                LOGGER.exception(f"Unable to defer {self.name}")
+                return
+            self.deferred = True
+            DEFERRALS.inc(interaction=self.name)
+
+    async def send_message(self, content: str, **kwargs: Any) -> None:
+        async with self._lock:
+            self._observe_reply()
+            await _send_message(self.interaction, content, **kwargs)
+
+    async def edit_message(self, **kwargs: Any) -> None:
+        async with self._lock:
+            self._observe_reply()
+            if self.interaction.response.is_done():
+                await self.interaction.edit_original_response(**kwargs)
+            else:
+                await self.interaction.response.edit_message(**kwargs)
+
+    def _observe_reply(self) -> None:
+        if self._replied:
+            return
+        self._replied = True
+        if self.deferred and self.elapsed() >= INTERACTION_TIMEOUT:
+            RESCUED.inc(interaction=self.name)
+
+
+async def _send_message(interaction: discord.Interaction, content: str, **kwargs: Any) -> None:
+    if interaction.response.is_done():
+        await interaction.followup.send(content, **kwargs)
+    else:
+        await interaction.response.send_message(content, **kwargs)
+
+
+async def respond(interaction: discord.Interaction, content: str, **kwargs: Any) -> None:
+    """Reply to an interaction, as a followup if it has already been acknowledged.
+
+    App commands are guarded by an InteractionDeadline, so use this instead of
+    interaction.response.send_message in their callbacks.
+    """
+    deadline = interaction.extras.get("deadline")
+    if isinstance(deadline, InteractionDeadline):
+        await deadline.send_message(content, **kwargs)
+    else:
+        await _send_message(interaction, content, **kwargs)
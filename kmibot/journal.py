@@ -0,0 +1,319 @@
+import asyncio
+import json
+import random
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable
+from logging import getLogger
+from pathlib import Path
+from typing import Any
+
+import discord
+import httpx
+
+from . import metrics
+from .resilience import FerryAPIUnavailableError
+
+LOGGER = getLogger(__name__)
+
+PENDING = metrics.gauge(
+    "kmibot_journal_pending",
+    "Journaled writes waiting to be replayed.",
+)
+ENTRIES = metrics.counter(
+    "kmibot_journal_entries_total",
+    "Journaled writes by outcome.",
+    ["kind", "outcome"],
+)
+REPLAY_DELAY = metrics.histogram(
+    "kmibot_journal_replay_delay_seconds",
+    "Time from a write being journaled to it being replayed successfully.",
+    ["kind"],
+)
+
+JournalHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    if isinstance(exc, ExceptionGroup):
+        return all(is_transient_error(e) for e in exc.exceptions)
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    if isinstance(exc, discord.HTTPException):
+        return exc.status == 429 or exc.status >= 500
+    # Includes FerryAPIUnavailableError, raised while the circuit breaker is open.
+    return isinstance(exc, httpx.TransportError | FerryAPIUnavailableError)
+
+
+def is_server_error(exc: BaseException) -> bool:
+    """Whether a server was reachable but failed to handle the request."""
+    if isinstance(exc, ExceptionGroup):
+        return any(is_server_error(e) for e in exc.exceptions)
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    if isinstance(exc, discord.HTTPException):
+        return exc.status >= 500
+    return False
+
+
+class WriteJournal:
+    """Durably record writes to the Ferry API, and replay them in order in the background.
+
+    Handlers can return as soon as their write is journaled. Writes that fail with a
+    transient error are retried, including after a restart, so an outage delays writes
+    rather than losing them. Writes that fail for any other reason, keep getting server
+    errors, or are still failing after max_age are moved to the dead_letters table, so
+    they don't block the rest.
+
+    Kinds can be registered with an opposite. A write with a key cancels out a pending
+    write of the opposite kind with the same key, e.g. an RSVP that is added then removed,
+    so neither reaches the Ferry API.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        retry_base: float,
+        retry_max: float,
+        max_attempts: int,
+        max_age: float,
+    ) -> None:
+        self._path = path
+        self._retry_base = retry_base
+        self._retry_max = retry_max
+        self._max_attempts = max_attempts
+        self._max_age = max_age
+        self._handlers: dict[str, JournalHandler] = {}
+        self._opposites: dict[str, str] = {}
+        self._db: sqlite3.Connection | None = None
+        # The connection is used from worker threads, one statement at a time.
+        self._db_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        # The entry being replayed has already started, so it can't be cancelled out.
+        self._replaying: int | None = None
+
+    def register(self, kind: str, handler: JournalHandler, *, opposite: str | None = None) -> None:
+        self._handlers[kind] = handler
+        if opposite is not None:
+            self._opposites[kind] = opposite
+
+    async def open(self) -> None:
+        try:
+            self._db = await asyncio.to_thread(self._connect, self._path)
+        except sqlite3.Error as exc:
+            # Better to keep running without durability than to crash on every start.
+            LOGGER.error(
+                f"Unable to open the write journal at {self._path.resolve()}: {exc}. "
+                "Journaled writes will be kept in memory and lost on restart."
+            )
+            self._db = await asyncio.to_thread(self._connect, ":memory:")
+        (pending,) = await self._fetchone("SELECT COUNT(*) FROM entries") or (0,)
+        PENDING.set(pending)
+        if pending:
+            LOGGER.info(f"{pending} journaled writes are waiting to be replayed")
+
+    def _connect(self, path: Path | str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=FULL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "kind TEXT NOT NULL, "
+            "key TEXT, "
+            "payload TEXT NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS entries_key ON entries (key)")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letters ("
+            "id INTEGER PRIMARY KEY, "
+            "kind TEXT NOT NULL, "
+            "payload TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "failed_at REAL NOT NULL, "
+            "error TEXT NOT NULL)"
+        )
+        return db
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._replay())
+
+    async def close(self, timeout: float) -> None:
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout)
+            except TimeoutError:
+                LOGGER.warning(f"Gave up replaying journaled writes after {timeout}s")
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._db is not None:
+            async with self._db_lock:
+                await asyncio.to_thread(self._db.close)
+            self._db = None
+
+    async def append(self, kind: str, payload: dict[str, Any], *, key: str | None = None) -> bool:
+        """Journal a write, returning False if it cancelled out a pending opposite write."""
+        if kind not in self._handlers:
+            raise LookupError(f"No journal handler is registered for {kind}")
+        opposite = self._opposites.get(kind) if key is not None else None
+
+        def insert(db: sqlite3.Connection, replaying: int) -> bool:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                if opposite is not None:
+                    row = db.execute(
+                        "SELECT id, kind FROM entries WHERE key = ? AND id > ? "
+                        "ORDER BY id DESC LIMIT 1",
+                        (key, replaying),
+                    ).fetchone()
+                    if row is not None and row[1] == opposite:
+                        db.execute("DELETE FROM entries WHERE id = ?", (row[0],))
+                        db.execute("COMMIT")
+                        return False
+                db.execute(
+                    "INSERT INTO entries (kind, key, payload, created_at) VALUES (?, ?, ?, ?)",
+                    (kind, key, json.dumps(payload), time.time()),
+                )
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+            return True
+
+        async with self._db_lock:
+            assert self._db is not None
+            journaled = await asyncio.to_thread(insert, self._db, self._replaying or 0)
+
+        if not journaled:
+            assert opposite is not None
+            LOGGER.info(f"{kind} cancelled out a pending {opposite} for {key}")
+            PENDING.dec()
+            ENTRIES.inc(kind=kind, outcome="cancelled")
+            ENTRIES.inc(kind=opposite, outcome="cancelled")
+            return False
+
+        PENDING.inc()
+        ENTRIES.inc(kind=kind, outcome="journaled")
+        self._idle.clear()
+        self._wakeup.set()
+        return True
+
+    async def get_pending_keys(self, kind: str) -> set[str]:
+        async with self._db_lock:
+            assert self._db is not None
+            db = self._db
+            rows = await asyncio.to_thread(
+                lambda: db.execute(
+                    "SELECT key FROM entries WHERE kind = ? AND key IS NOT NULL", (kind,)
+                ).fetchall()
+            )
+        return {key for (key,) in rows}
+
+    async def _execute(self, sql: str, params: tuple[Any, ...] = ()) -> None:
+        async with self._db_lock:
+            assert self._db is not None
+            await asyncio.to_thread(self._db.execute, sql, params)
+
+    async def _fetchone(self, sql: str, params: tuple[Any, ...] = ()) -> tuple[Any, ...] | None:
+        async with self._db_lock:
+            assert self._db is not None
+            db = self._db
+            return await asyncio.to_thread(lambda: db.execute(sql, params).fetchone())
+
+    async def _dead_letter(self, entry_id: int, error: str) -> None:
+        def move(db: sqlite3.Connection) -> None:
+            db.execute("BEGIN")
+            try:
+                db.execute(
+                    "INSERT INTO dead_letters (id, kind, payload, created_at, failed_at, error) "
+                    "SELECT id, kind, payload, created_at, ?, ? FROM entries WHERE id = ?",
+                    (time.time(), error, entry_id),
+                )
+                db.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+        async with self._db_lock:
+            assert self._db is not None
+            await asyncio.to_thread(move, self._db)
+
+    async def _replay(self) -> None:
+        attempt = 0
+        # Only failures where the server responded count towards max_attempts, so an
+        # outage doesn't use them up.
+        server_errors = 0
+        while True:
+            # Clear before looking, so that an append while we look isn't missed.
+            self._wakeup.clear()
+            async with self._db_lock:
+                assert self._db is not None
+                db = self._db
+                row = await asyncio.to_thread(
+                    lambda: db.execute(
+                        "SELECT id, kind, payload, created_at FROM entries ORDER BY id LIMIT 1"
+                    ).fetchone()
+                )
+                # Set while holding the lock, so append sees it before it can cancel the entry.
+                self._replaying = row[0] if row is not None else None
+            if row is None:
+                self._idle.set()
+                await self._wakeup.wait()
+                continue
+
+            entry_id, kind, payload, created_at = row
+            if (handler := self._handlers.get(kind)) is None:
+                LOGGER.error(
+                    f"Moving journaled {kind} {entry_id} to dead_letters, it has no handler: "
+                    f"{payload}"
+                )
+                await self._dead_letter(entry_id, "No handler is registered")
+                outcome = "dead_lettered"
+            else:
+                try:
+                    await handler(json.loads(payload))
+                except Exception as exc:  # noqa: BLE001
+                    if is_server_error(exc):
+                        server_errors += 1
+                    if (
+                        is_transient_error(exc)
+                        and server_errors < self._max_attempts
+                        and time.time() - created_at < self._max_age
+                    ):
+                        # Later writes may depend on this one, so retry it before moving on.
+                        delay = random.uniform(
+                            0, min(self._retry_max, self._retry_base * 2**attempt)
+                        )
+                        LOGGER.warning(
+                            f"Journaled {kind} {entry_id} failed with {exc!r}, "
+                            f"retrying in {delay:.2f}s"
+                        )
+                        attempt += 1
+                        ENTRIES.inc(kind=kind, outcome="retried")
+                        await asyncio.sleep(delay)
+                        continue
+
+                    # Keep it rather than losing the write, so it can be inspected and replayed.
+                    LOGGER.error(
+                        f"Moving journaled {kind} {entry_id} to dead_letters after "
+                        f"{attempt + 1} attempts: {payload}",
+                        exc_info=exc,
+                    )
+                    await self._dead_letter(entry_id, repr(exc))
+                    outcome = "dead_lettered"
+                else:
+                    await self._execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+                    outcome = "replayed"
+                    REPLAY_DELAY.observe(time.time() - created_at, kind=kind)
+
+            self._replaying = None
+            attempt = server_errors = 0
+            PENDING.dec()
+            ENTRIES.inc(kind=kind, outcome=outcome)
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import Enum
+
+from . import metrics
+
+LANE_WAIT = metrics.histogram(
+    "kmibot_ferry_lane_wait_seconds",
+    "Time Ferry API requests waited for a free slot.",
+    ["lane"],
+)
+LANE_WAITING = metrics.gauge(
+    "kmibot_ferry_lane_waiting",
+    "Ferry API requests waiting for a free slot.",
+    ["lane"],
+)
+
+
+class Lane(Enum):
+    # In priority order.
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+_current_lane: ContextVar[Lane] = ContextVar("lane", default=Lane.BACKGROUND)
+
+
+def get_lane() -> Lane:
+    return _current_lane.get()
+
+
+def set_lane(lane: Lane) -> None:
+    """Use a lane for the rest of the current task, and any tasks it starts."""
+    _current_lane.set(lane)
+
+
+@contextmanager
+def use_lane(lane: Lane) -> Iterator[None]:
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+class PriorityLimiter:
+    """Limit how many requests run at once, giving free slots to interactive requests first."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._active = 0
+        self._waiters: dict[Lane, deque[asyncio.Future[None]]] = {lane: deque() for lane in Lane}
+        for lane in Lane:
+            LANE_WAITING.set(0, lane=lane.value)
+
+    @asynccontextmanager
+    async def acquire(self, lane: Lane) -> AsyncIterator[None]:
+        started_at = time.perf_counter()
+        if self._active < self.limit and not any(self._waiters.values()):
+            self._active += 1
+        else:
+            await self._wait(lane)
+        LANE_WAIT.observe(time.perf_counter() - started_at, lane=lane.value)
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _wait(self, lane: Lane) -> None:
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        waiters = self._waiters[lane]
+        waiters.append(future)
+        LANE_WAITING.set(len(waiters), lane=lane.value)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # We were handed a slot just as we were cancelled, so pass it on.
+                self._release()
+            else:
+                waiters.remove(future)
+                LANE_WAITING.set(len(waiters), lane=lane.value)
+            raise
+
+    def _release(self) -> None:
+        # Hand the slot straight to the next waiter, so nobody can jump the queue.
+        for lane, waiters in self._waiters.items():
+            while waiters:
+                future = waiters.popleft()
+                LANE_WAITING.set(len(waiters), lane=lane.value)
+                if not future.done():
+                    future.set_result(None)
+                    return
+        self._active -= 1
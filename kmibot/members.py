@@ -0,0 +1,59 @@
+from logging import getLogger
+
+import discord
+
+from . import metrics
+from .cache import SingleFlight, TTLCache
+
+LOGGER = getLogger(__name__)
+
+MEMBER_FETCHES = metrics.counter(
+    "kmibot_member_fetches_total",
+    "Guild members fetched from Discord because they were not cached.",
+    ["outcome"],
+)
+
+
+class MemberResolver:
+    """Look up guild members when they are needed, instead of caching every member at startup.
+
+    Members that discord.py has cached are returned directly. Others are fetched from
+    Discord and kept in a small cache of our own.
+    """
+
+    def __init__(self, client: discord.Client, guild_id: int, maxsize: int, ttl: float) -> None:
+        self._client = client
+        self._guild_id = guild_id
+        self.cache: TTLCache[int, discord.Member] = TTLCache("member", maxsize, ttl)
+        self._fetches: SingleFlight[int, discord.Member | None] = SingleFlight("member")
+
+    def get_cached(self, user_id: int) -> discord.Member | None:
+        if (guild := self._client.get_guild(self._guild_id)) is not None:
+            if (member := guild.get_member(user_id)) is not None:
+                return member
+        return self.cache.get(user_id)
+
+    async def get(self, user_id: int) -> discord.Member | None:
+        if (member := self.get_cached(user_id)) is not None:
+            return member
+
+        member = await self._fetches.run(user_id, lambda: self._fetch(user_id))
+        if member is not None:
+            self.cache.set(user_id, member)
+        return member
+
+    async def _fetch(self, user_id: int) -> discord.Member | None:
+        if (guild := self._client.get_guild(self._guild_id)) is None:
+            LOGGER.warning(f"Unable to fetch member {user_id}, the guild is not available")
+            return None
+
+        try:
+            member = await guild.fetch_member(user_id)
+        except discord.NotFound:
+            MEMBER_FETCHES.inc(outcome="not_found")
+            return None
+        except discord.HTTPException:
+            MEMBER_FETCHES.inc(outcome="error")
+            raise
+        MEMBER_FETCHES.inc(outcome="found")
+        return member
@@ -0,0 +1,242 @@
+import asyncio
+import math
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from logging import getLogger
+
+LOGGER = getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, math.inf)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], **extra: str) -> str:
+    pairs = list(zip(names, values, strict=True)) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        pass
+
+    def expose(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, /, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, /, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, /, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, /, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        if self.buckets[-1] != math.inf:
+            self.buckets += (math.inf,)
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, /, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._counts.setdefault(key, [0] * len(self.buckets))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        self._sums[key] = self._sums.get(key, 0) + value
+
+    def get_count(self, **labels: str) -> int:
+        counts = self._counts.get(self._key(labels))
+        return counts[-1] if counts else 0
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> Iterator[str]:
+        for key, counts in self._counts.items():
+            for bound, count in zip(self.buckets, counts, strict=True):
+                labels = _format_labels(self.labelnames, key, le=_format_value(bound))
+                yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(self._sums[key])}"
+            yield f"{self.name}_count{labels} {counts[-1]}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"A metric called {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def expose(self) -> str:
+        return "\n".join(metric.expose() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    metric = Counter(name, documentation, labelnames)
+    REGISTRY.register(metric)
+    return metric
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    metric = Gauge(name, documentation, labelnames)
+    REGISTRY.register(metric)
+    return metric
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    metric = Histogram(name, documentation, labelnames, buckets)
+    REGISTRY.register(metric)
+    return metric
+
+
+class MetricsServer:
+    """Serve the registry in the Prometheus text exposition format."""
+
+    def __init__(self, host: str, port: int, registry: Registry = REGISTRY) -> None:
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        LOGGER.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            # Drain the headers, we don't need any of them.
+            while await reader.readline() not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status = "200 OK"
+                body = self.registry.expose().encode()
+            else:
+                status = "404 Not Found"
+                body = b"Not Found\n"
+
+            writer.write(
+                (
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode()
+                + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -1,17 +1,19 @@
 from __future__ import annotations
 
-import asyncio
 from logging import getLogger
-import re
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import discord
 
 from kmibot.modules import Module
+from kmibot.routing import AuthorKind, Subscription
 from kmibot.api import FerryAPI
 
 from .commands import FerryCommand
+from .leaderboard import LeaderboardPublisher
+from .matcher import BannedWordMatcher
 from .modals import AccuseModal
+from .views import RatifyButton
 
 if TYPE_CHECKING:
     from kmibot.client import DiscordClient
@@ -24,24 +26,29 @@ class FerryModule(Module):
         self.client = client
         self.command_group = FerryCommand(client.config, self)
         self.api_client = api_client
-        client.tree.add_command(self.command_group, guild=client.guild)
-        client.tree.context_menu(name="Accuse of Ferrying", guild=client.guild)(
-            self.accuse_context_menu
+        self.leaderboard = LeaderboardPublisher(
+            self,
+            debounce=client.config.ferry.leaderboard_debounce,
+            max_age=client.config.ferry.leaderboard_max_age,
+            message_path=client.config.ferry.leaderboard_message_path,
+        )
+        self.matcher = BannedWordMatcher(
+            [client.config.ferry.banned_word, *client.config.ferry.banned_words]
         )
+        client.tree.add_command(self.command_group, guild=client.guild)
+        # The modal has to be the first response, so this cannot be deferred.
+        client.tree.context_menu(
+            name="Accuse of Ferrying", guild=client.guild, extras={"deadline": False}
+        )(self.accuse_context_menu)
 
-        if hasattr(client, "on_message"):
-            raise RuntimeError(
-                "Only one module can have on_message at the moment.",
-            )
-        else:
-            client.on_message = self.on_message  # type: ignore[attr-defined]
+        client.journal.register("ferry.accusation", self._replay_accusation)
 
-        if hasattr(client, "on_reaction_add"):
-            raise RuntimeError(
-                "Only one module can have on_reaction_add at the moment.",
-            )
-        else:
-            client.on_reaction_add = self.on_reaction_add  # type: ignore[attr-defined]
+    async def setup_hook(self, client: DiscordClient) -> None:
+        # Ratify buttons are handled by pattern, so they keep working after a restart.
+        client.add_dynamic_items(RatifyButton)
+
+    async def close(self, client: DiscordClient) -> None:
+        await self.leaderboard.close()
 
     @property
     def channel(self) -> discord.TextChannel:
@@ -49,28 +56,49 @@ class FerryModule(Module):
         assert isinstance(channel, discord.TextChannel)
         return channel
 
+    def get_subscriptions(self) -> list[Subscription]:
+        # Any human may ferry in any channel.
+        return [Subscription("message", self.on_message, authors=AuthorKind.HUMAN)]
+
     async def on_ready(self, client: DiscordClient) -> None:
         user = await self.api_client.get_current_user()
         LOGGER.info(f"Authenticated to Ferry API as {user.username}")
 
-    async def on_reaction_add(self, reaction: discord.Reaction, user: discord.User) -> None:
-        pass
-
     async def on_message(self, message: discord.Message) -> None:
         assert self.client.user
-        pattern = rf"\b{self.client.config.ferry.banned_word}\b"
-        if message.author != self.client.user and re.match(
-            pattern, message.content, flags=re.IGNORECASE
-        ):
+        if message.author != self.client.user and self.matcher.matches(message.content):
             LOGGER.info(f"{message.author.display_name} ferried in #{message.channel}")
             for emoji in self.client.config.ferry.emoji_reacts:
-                asyncio.create_task(message.add_reaction(emoji))
+                self.client.outbound.add_reaction(message, emoji)
 
-            await self.command_group.publish_accusation(
-                message.author,
-                self.client.user,
-                quote=message.content,
-            )
+            await self.accuse(message.author, self.client.user, quote=message.content)
+
+    async def accuse(
+        self,
+        criminal: discord.abc.User,
+        accuser: discord.abc.User,
+        *,
+        quote: str,
+    ) -> None:
+        # Accusations are journaled, so they are published once the Ferry API is available.
+        await self.client.journal.append(
+            "ferry.accusation",
+            {"criminal_id": criminal.id, "accuser_id": accuser.id, "quote": quote},
+        )
+
+    async def _get_user(self, user_id: int) -> discord.abc.User:
+        if self.client.user and user_id == self.client.user.id:
+            return self.client.user
+        return await self.client.members.get(user_id) or await self.client.fetch_user(user_id)
+
+    async def _replay_accusation(self, payload: dict[str, Any]) -> None:
+        criminal = await self._get_user(payload["criminal_id"])
+        accuser = await self._get_user(payload["accuser_id"])
+        await self.command_group.publish_accusation(
+            criminal,  # type: ignore[arg-type]
+            accuser,  # type: ignore[arg-type]
+            quote=payload["quote"],
+        )
 
     async def accuse_context_menu(
         self, interaction: discord.Interaction, member: discord.Member
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from logging import getLogger
 from typing import TYPE_CHECKING
 
@@ -8,6 +9,7 @@ from discord.app_commands import Group, command, describe
 import httpx
 
 from kmibot.config import BotConfig
+from kmibot.interactions import respond
 from kmibot.modules.ferry.views import RatifyAccusationView
 
 from .modals import AccuseModal
@@ -24,29 +26,18 @@ class FerryCommand(Group):
         self.config = config
         self.ferry_module = module
 
-    async def get_leaderboard(self) -> str:
-        people = await self.ferry_module.api_client.get_leaderboard()  # type: ignore[has-type]
-        content = [
-            f"{person.get_display_for_message()} {person.ferry_sequence}" for person in people
-        ]
-        return "\n".join(["Bad people:"] + content)
-
     async def publish_accusation(
         self,
         criminal: discord.User | discord.Member,
         accuser: discord.User | discord.ClientUser | discord.Member,
         quote: str,
     ) -> None:
-        try:
-            person_criminal = await self.ferry_module.api_client.get_person_for_discord_member(  # type: ignore[has-type]
-                criminal
-            )
-            person_accuser = await self.ferry_module.api_client.get_person_for_discord_member(  # type: ignore[has-type]
-                accuser
-            )
-        except httpx.HTTPStatusError as exc:
-            LOGGER.exception(exc)
-            return
+        api_client = self.ferry_module.api_client  # type: ignore[has-type]
+        async with asyncio.TaskGroup() as tg:
+            criminal_lookup = tg.create_task(api_client.get_person_for_discord_member(criminal))
+            accuser_lookup = tg.create_task(api_client.get_person_for_discord_member(accuser))
+        person_criminal = criminal_lookup.result()
+        person_accuser = accuser_lookup.result()
 
         accusation = await self.ferry_module.api_client.create_accusation(  # type: ignore[has-type]
             created_by=person_accuser.id,
@@ -64,11 +55,19 @@ class FerryCommand(Group):
         )
 
         view = RatifyAccusationView(self.ferry_module, accusation)
+        # Clicks are handled by the dynamic RatifyButton, so don't keep this view in the store.
+        view.stop()
 
-        # Publish the accusation
-        await self.ferry_module.channel.send("\n".join(lines), view=view)
+        # Publish the accusation. It has been created, so don't raise and have it created again.
+        try:
+            await self.ferry_module.client.outbound.send_message(
+                self.ferry_module.channel, "\n".join(lines), view=view
+            )
+        except discord.HTTPException:
+            LOGGER.exception(f"Unable to publish accusation {accusation.id}")
 
-    @command(description="Accuse somebody of ferrying.")  # type: ignore[arg-type]
+    # The modal has to be the first response, so this cannot be deferred.
+    @command(description="Accuse somebody of ferrying.", extras={"deadline": False})  # type: ignore[arg-type]
     @describe(member="The criminal you are accusing.")
     async def accuse(
         self,
@@ -78,7 +77,7 @@ class FerryCommand(Group):
         LOGGER.info(f"{interaction.user} used /ferry accuse")
 
         if interaction.user == member:
-            await interaction.response.send_message("Who watches the watchman?", ephemeral=True)
+            await respond(interaction, "Who watches the watchman?", ephemeral=True)
             return
 
         await interaction.response.send_modal(AccuseModal(self.ferry_module, criminal=member))
@@ -86,8 +85,8 @@ class FerryCommand(Group):
     @command(description="Get the current scoreboard")
     async def scoreboard(self, interaction: discord.Interaction) -> None:
         LOGGER.info(f"{interaction.user} used /ferry scoreboard")
-        leaderboard = await self.get_leaderboard()
-        await interaction.response.send_message(leaderboard, ephemeral=True)
+        leaderboard = await self.ferry_module.leaderboard.get_leaderboard()  # type: ignore[has-type]
+        await respond(interaction, leaderboard, ephemeral=True)
 
     @command(description="Get a FACT")
     async def fact(self, interaction: discord.Interaction) -> None:
@@ -97,16 +96,12 @@ class FerryCommand(Group):
                 interaction.user
             )
             fact_data = await self.ferry_module.api_client.get_fact_for_person(person.id)  # type: ignore[has-type]
-        except httpx.HTTPStatusError as exc:
+        except httpx.HTTPError as exc:
             LOGGER.exception(exc)
-            await interaction.response.send_message("Unable to get FACT", ephemeral=True)
+            await respond(interaction, "Unable to get FACT", ephemeral=True)
             return
 
         if fact_data.link_token is None:
-            await interaction.response.send_message(
-                "Sorry, no FACT is currently available.", ephemeral=True
-            )
+            await respond(interaction, "Sorry, no FACT is currently available.", ephemeral=True)
         else:
-            await interaction.response.send_message(
-                f"Your FACT is `{fact_data.link_token}`.", ephemeral=True
-            )
+            await respond(interaction, f"Your FACT is `{fact_data.link_token}`.", ephemeral=True)
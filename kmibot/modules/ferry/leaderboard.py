@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import discord
+import httpx
+
+from kmibot.lanes import Lane, use_lane
+
+if TYPE_CHECKING:
+    from . import FerryModule
+
+LOGGER = getLogger(__name__)
+
+LEADERBOARD_HEADER = "Bad people:"
+
+
+class LeaderboardPublisher:
+    """Keep a single leaderboard message in the ferry channel up to date."""
+
+    def __init__(
+        self,
+        ferry_module: FerryModule,
+        *,
+        debounce: float,
+        max_age: float,
+        message_path: Path,
+    ) -> None:
+        self._ferry_module = ferry_module
+        self._debounce = debounce
+        self._max_age = max_age
+        self._message_path = message_path
+
+        self._content: str | None = None
+        self._rendered_at = 0.0
+        self._message: discord.Message | None = None
+        self._dirty = False
+        self._task: asyncio.Task[None] | None = None
+
+    async def render(self) -> str:
+        people = await self._ferry_module.api_client.get_leaderboard()  # type: ignore[has-type]
+        content = [
+            f"{person.get_display_for_message()} {person.ferry_sequence}" for person in people
+        ]
+        self._content = "\n".join([LEADERBOARD_HEADER] + content)
+        self._rendered_at = time.monotonic()
+        return self._content
+
+    async def get_leaderboard(self) -> str:
+        if self._content is not None and time.monotonic() - self._rendered_at < self._max_age:
+            return self._content
+        return await self.render()
+
+    def request_publish(self) -> None:
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._publish_when_settled())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _publish_when_settled(self) -> None:
+        # Requests that arrive while we wait or publish are merged into the next pass.
+        while self._dirty:
+            await asyncio.sleep(self._debounce)
+            self._dirty = False
+            try:
+                # This task is started by a Ratify click, but nobody is waiting on it.
+                with use_lane(Lane.BACKGROUND):
+                    await self.publish()
+            except (httpx.HTTPError, discord.HTTPException):
+                LOGGER.exception("Unable to publish the leaderboard")
+
+    async def publish(self) -> None:
+        content = await self.render()
+        channel = self._ferry_module.channel
+
+        if self._message is None:
+            self._message = await self._find_existing_message(channel)
+
+        if self._message is not None:
+            try:
+                self._message = await self._message.edit(content=content)
+                return
+            except discord.NotFound:
+                LOGGER.info("The leaderboard message was deleted, posting a new one")
+
+        self._message = await self._ferry_module.client.outbound.send_message(channel, content)
+        self._save_message_id(self._message.id)
+
+    def _save_message_id(self, message_id: int) -> None:
+        try:
+            self._message_path.write_text(f"{message_id}\n")
+        except OSError as exc:
+            LOGGER.warning(f"Unable to save the leaderboard message id: {exc}")
+
+    async def _find_existing_message(self, channel: discord.TextChannel) -> discord.Message | None:
+        # The channel may be busy, so look up the message we saved before searching for it.
+        try:
+            message_id = int(self._message_path.read_text())
+        except (FileNotFoundError, ValueError):
+            pass
+        else:
+            try:
+                return await channel.fetch_message(message_id)
+            except discord.NotFound:
+                LOGGER.info("The saved leaderboard message was deleted")
+
+        bot_user = self._ferry_module.client.user
+        async for message in channel.history(limit=50):
+            if message.author == bot_user and message.content.startswith(LEADERBOARD_HEADER):
+                self._save_message_id(message.id)
+                return message
+        return None
@@ -0,0 +1,44 @@
+import re
+import unicodedata
+from collections.abc import Iterable
+
+
+def normalise(text: str) -> str:
+    if text.isascii():
+        return text.lower()
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+class BannedWordMatcher:
+    """Find banned words or phrases anywhere in a message, ignoring case and Unicode forms.
+
+    Most messages contain none of the words, so a substring check rejects them before
+    the regex is run.
+    """
+
+    def __init__(self, words: Iterable[str]) -> None:
+        normalised = (" ".join(normalise(word).split()) for word in words)
+        self.words = tuple(dict.fromkeys(word for word in normalised if word))
+        if not self.words:
+            raise ValueError("At least one banned word is required")
+
+        first_words = {word.split()[0] for word in self.words}
+        # "train" already finds every message containing "trains", so only check the former.
+        self._needles = frozenset(
+            needle
+            for needle in first_words
+            if not any(other != needle and other in needle for other in first_words)
+        )
+        # Longest first, so that "choo choo" is preferred over "choo".
+        alternatives = (
+            r"\s+".join(re.escape(part) for part in word.split())
+            for word in sorted(self.words, key=len, reverse=True)
+        )
+        self._pattern = re.compile(rf"(?<!\w)(?:{'|'.join(alternatives)})(?!\w)")
+
+    def matches(self, text: str) -> bool:
+        normalised = normalise(text)
+        for needle in self._needles:
+            if needle in normalised:
+                return self._pattern.search(normalised) is not None
+        return False
@@ -2,6 +2,8 @@ from typing import TYPE_CHECKING
 
 import discord
 
+from kmibot.interactions import InteractionDeadline
+
 if TYPE_CHECKING:
     from . import FerryModule
 
@@ -21,12 +23,14 @@ class AccuseModal(discord.ui.Modal):
         super().__init__(title=title)
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        await self.module.command_group.publish_accusation(  # type: ignore[has-type]
-            self.criminal,
-            interaction.user,
-            quote=self.evidence.value,
-        )
-        await interaction.response.send_message(
-            "The crime has been submitted for a public trial. You are not allowed to ratify it.",
+        async with InteractionDeadline(
+            interaction,
+            name="accuse",
+            budget=self.module.client.config.interactions.defer_after,
             ephemeral=True,
-        )
+        ) as deadline:
+            await self.module.accuse(self.criminal, interaction.user, quote=self.evidence.value)
+            await deadline.send_message(
+                "The crime has been submitted for a public trial. You are not allowed to ratify it.",
+                ephemeral=True,
+            )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from http import HTTPStatus
 from logging import getLogger
 import re
@@ -8,67 +9,116 @@ from uuid import UUID
 import discord
 import httpx
 
-from kmibot.api import AccusationSchema
+from kmibot.api import AccusationSchema, PersonSchema
+from kmibot.interactions import InteractionDeadline
+from kmibot.lanes import Lane, use_lane
 
 if typing.TYPE_CHECKING:
+    from kmibot.client import DiscordClient
     from kmibot.modules.ferry import FerryModule
 
 LOGGER = getLogger(__name__)
 
 
-class RatifyButton(discord.ui.Button):
-    def __init__(self, *args, ferry_module: FerryModule, **kwargs):
-        super().__init__(*args, **kwargs)
+class RatifyButton(
+    discord.ui.DynamicItem[discord.ui.Button], template=r"button:ratify:(?P<id>[0-9a-f-]{36})"
+):
+    """A Ratify button for any accusation, including those posted before a restart.
+
+    Buttons are matched by their custom id, so no view is kept for each accusation.
+    """
+
+    def __init__(self, accusation_id: UUID, ferry_module: FerryModule) -> None:
+        super().__init__(
+            discord.ui.Button(
+                label="Ratify",
+                style=discord.ButtonStyle.primary,
+                custom_id=f"button:ratify:{accusation_id}",
+            )
+        )
+        self.accusation_id = accusation_id
         self._api_client = ferry_module.api_client  # type: ignore[has-type]
         self._ferry_module = ferry_module
 
-    def get_accusation_id(self) -> UUID | None:
-        if ma := re.match(r"button:ratify:(.*)", self.custom_id or ""):
-            return UUID(ma.group(1))
-        return None
+    @classmethod
+    async def from_custom_id(  # noqa: ANN102
+        cls,
+        interaction: discord.Interaction,
+        item: discord.ui.Item[typing.Any],
+        match: re.Match[str],
+        /,
+    ) -> RatifyButton:
+        from . import FerryModule
+
+        client = typing.cast("DiscordClient", interaction.client)
+        return cls(UUID(match["id"]), client.get_module(FerryModule))
+
+    async def _get_accusation_and_suspect(
+        self, accusation_id: UUID
+    ) -> tuple[AccusationSchema, PersonSchema]:
+        accusation = await self._api_client.get_accusation(accusation_id)
+        suspect = await self._api_client.get_person(accusation.suspect.id)
+        return accusation, suspect
 
     async def callback(self, interaction: discord.Interaction) -> None:
-        accusation_id = self.get_accusation_id()
-
+        async with InteractionDeadline(
+            interaction,
+            name="ratify",
+            budget=self._ferry_module.client.config.interactions.defer_after,
+        ) as deadline:
+            with use_lane(Lane.INTERACTIVE):
+                await self._ratify(interaction, deadline)
+
+    async def _ratify(
+        self, interaction: discord.Interaction, deadline: InteractionDeadline
+    ) -> None:
+        failed = False
         try:
-            accusation = await self._api_client.get_accusation(accusation_id or UUID(int=0))
-            suspect = await self._api_client.get_person(accusation.suspect.id)
-            ratifier = await self._api_client.get_person_for_discord_member(interaction.user)
-        except httpx.HTTPStatusError as exc:
-            LOGGER.exception(exc)
-            await interaction.response.send_message(
-                "An error occurred during ratification", ephemeral=True
-            )
+            async with asyncio.TaskGroup() as tg:
+                lookup = tg.create_task(self._get_accusation_and_suspect(self.accusation_id))
+                ratifier_lookup = tg.create_task(
+                    self._api_client.get_person_for_discord_member(interaction.user)
+                )
+        except* httpx.HTTPError as eg:
+            LOGGER.exception(eg)
+            failed = True
+        if failed:
+            await deadline.send_message("An error occurred during ratification", ephemeral=True)
             return
 
+        accusation, suspect = lookup.result()
+        ratifier = ratifier_lookup.result()
+
         if accusation.created_by.id == ratifier.id:
-            await interaction.response.send_message(
+            await deadline.send_message(
                 "You cannot ratify an accusation that you made!", ephemeral=True
             )
             return
 
         if accusation.suspect.id == ratifier.id:
-            await interaction.response.send_message(
+            await deadline.send_message(
                 "You cannot ratify an accusation made against you!", ephemeral=True
             )
             return
 
         try:
-            assert accusation_id is not None
-            ratification = await self._api_client.create_ratification(accusation_id, ratifier.id)
-            await interaction.response.edit_message(view=None)
-        except httpx.HTTPStatusError as exc:
-            if exc.response.status_code == HTTPStatus.CONFLICT:
-                await interaction.response.edit_message(view=None)
+            ratification = await self._api_client.create_ratification(
+                self.accusation_id, ratifier.id
+            )
+            await deadline.edit_message(view=None)
+        except httpx.HTTPError as exc:
+            if (
+                isinstance(exc, httpx.HTTPStatusError)
+                and exc.response.status_code == HTTPStatus.CONFLICT
+            ):
+                await deadline.edit_message(view=None)
                 await interaction.followup.send(
                     "That accusation has already been ratified.",
                     ephemeral=True,
                 )
             else:
                 LOGGER.exception(exc)
-                await interaction.response.send_message(
-                    "An error occurred during ratification", ephemeral=True
-                )
+                await deadline.send_message("An error occurred during ratification", ephemeral=True)
             return
 
         lines = [
@@ -76,21 +126,12 @@ class RatifyButton(discord.ui.Button):
             "",
             f"{suspect.get_display_for_message()} has been sentenced to {ratification.consequence.content}",
         ]
-        await interaction.followup.send("\n".join(lines))
+        await self._ferry_module.client.outbound.send_followup(interaction, "\n".join(lines))
 
-        leaderboard = await self._ferry_module.command_group.get_leaderboard()  # type: ignore[has-type]
-        await self._ferry_module.channel.send(leaderboard)
+        self._ferry_module.leaderboard.request_publish()  # type: ignore[has-type]
 
 
 class RatifyAccusationView(discord.ui.View):
     def __init__(self, ferry_module: FerryModule, accusation: AccusationSchema):
         super().__init__(timeout=None)
-
-        self.add_item(
-            RatifyButton(
-                ferry_module=ferry_module,
-                label="Ratify",
-                style=discord.ButtonStyle.primary,
-                custom_id=f"button:ratify:{accusation.id}",
-            )
-        )
+        self.add_item(RatifyButton(accusation.id, ferry_module))
@@ -2,6 +2,8 @@ from typing import TYPE_CHECKING
 
 import discord
 
+from kmibot.routing import Subscription
+
 if TYPE_CHECKING:
     from kmibot.client import DiscordClient
     from kmibot.api import FerryAPI
@@ -11,9 +13,21 @@ class Module:
     def __init__(self, client: "DiscordClient", api_client: "FerryAPI") -> None:
         pass
 
+    def get_subscriptions(self) -> list[Subscription]:
+        return []
+
+    async def setup_hook(self, client: "DiscordClient") -> None:
+        pass
+
+    async def close(self, client: "DiscordClient") -> None:
+        pass
+
     async def on_ready(self, client: "DiscordClient") -> None:
         pass
 
+    async def on_resumed(self, client: "DiscordClient") -> None:
+        pass
+
     async def on_scheduled_event_create(
         self,
         client: "DiscordClient",
@@ -29,6 +43,13 @@ class Module:
     ) -> None:
         pass
 
+    async def on_scheduled_event_delete(
+        self,
+        client: "DiscordClient",
+        event: discord.ScheduledEvent,
+    ) -> None:
+        pass
+
     async def on_scheduled_event_user_add(
         self, client: "DiscordClient", event: discord.ScheduledEvent, user: discord.User
     ) -> None:
@@ -1,5 +1,6 @@
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
 
 import discord
 from discord import EventStatus
@@ -8,7 +9,9 @@ from kmibot.api import FerryAPI
 
 from ..module import Module
 from .commands import PubCommand
-from .utils import event_is_pub, get_formatted_pub_name, get_pub_buttons_view
+from .index import PubEventIndex
+from .reconciler import AttendeeReconciler
+from .utils import event_is_pub, get_formatted_pub_name, get_pub_buttons_view, get_rsvp_key
 
 if TYPE_CHECKING:
     from kmibot.client import DiscordClient
@@ -21,14 +24,53 @@ class PubModule(Module):
     def __init__(self, client: "DiscordClient", api_client: FerryAPI) -> None:
         self.client = client
         self.api_client = api_client
-        client.tree.add_command(PubCommand(client.config, api_client), guild=client.guild)
+        # Handlers update the index before their first await, so updates apply in order.
+        self.pub_events = PubEventIndex()
+        self.reconciler = AttendeeReconciler(
+            api_client,
+            client.journal,
+            self.pub_events,
+            self._add_attendee,
+            interval=client.config.pub.reconcile_interval,
+        )
+        client.tree.add_command(
+            PubCommand(client.config, api_client, client.outbound, client.journal, self.pub_events),
+            guild=client.guild,
+        )
+        client.journal.register(
+            "pub.add_attendee", self._replay_add_attendee, opposite="pub.remove_attendee"
+        )
+        client.journal.register(
+            "pub.remove_attendee", self._replay_remove_attendee, opposite="pub.add_attendee"
+        )
+        client.journal.register("pub.update_table", self._replay_update_table)
+
+    async def on_ready(self, client: "DiscordClient") -> None:
+        assert client.user
+        if guild := client.get_guild(client.config.discord.guild_id):
+            self.pub_events.rebuild(guild.scheduled_events, client.user.id)
+        # Reconciling doesn't need the catalogue, so start it even if Ferry is down.
+        self.reconciler.start()
+        await self.api_client.pubs.load()
+
+    async def close(self, client: "DiscordClient") -> None:
+        await self.reconciler.close()
+
+    async def on_resumed(self, client: "DiscordClient") -> None:
+        # Gateway events may have been missed while we were disconnected.
+        await self.reconciler.reconcile()
 
     async def on_scheduled_event_create(
         self,
         client: "DiscordClient",
         event: discord.ScheduledEvent,
     ) -> None:
-        creator = event.creator
+        self.pub_events.update(event)
+
+        # The creator is only included if they are cached, so fetch them if necessary.
+        creator: discord.User | discord.Member | None = event.creator
+        if creator is None and event.creator_id is not None:
+            creator = await self.client.members.get(event.creator_id)
         if not creator:
             return
 
@@ -38,14 +80,15 @@ class PubModule(Module):
             if creator.id != bot_user.id:
                 LOGGER.warning("A pub event was manually created.")
                 await event.delete(reason="Removing manually created pub event")
-                await creator.send(
-                    "I've deleted your manually created pub event. Please use /pub next."
+                await self.client.outbound.send_message(
+                    creator, "I've deleted your manually created pub event. Please use /pub next."
                 )
         else:
             assert isinstance(self.client.guild, discord.Guild)
-            await creator.send(
+            await self.client.outbound.send_message(
+                creator,
                 f'Hey, I just say that you created an event "{event.name}" for {self.client.guild.name}\n'
-                "That event doesn't look like a pub event, but if it is I'm going to ignore it."
+                "That event doesn't look like a pub event, but if it is I'm going to ignore it.",
             )
 
     async def on_scheduled_event_update(
@@ -54,38 +97,80 @@ class PubModule(Module):
         old_event: discord.ScheduledEvent,
         new_event: discord.ScheduledEvent,
     ) -> None:
+        self.pub_events.update(new_event)
         if event_is_pub(old_event):
             await self.handle_pub_event_change(client, old_event, new_event)
 
+    async def on_scheduled_event_delete(
+        self,
+        client: "DiscordClient",
+        event: discord.ScheduledEvent,
+    ) -> None:
+        self.pub_events.remove(event.id)
+
     async def on_scheduled_event_user_add(
         self, client: "DiscordClient", event: discord.ScheduledEvent, user: discord.User
     ) -> None:
-        if event_is_pub(event):
-            pub_event = await self.api_client.get_pub_event_by_discord_id(event.id)
-            if pub_event:
-                person = await self.api_client.get_person_for_discord_member(user)
-                await self.api_client.add_attendee_to_pub_event(pub_event.id, person.id)
-                LOGGER.info(f"Added {person.display_name} to {pub_event}")
+        # Only pub events the bot created are in the Ferry API, so don't look up any others.
+        if self.pub_events.is_managed(event.id):
+            await self._add_attendee(event, user)
 
     async def on_scheduled_event_user_remove(
         self, client: "DiscordClient", event: discord.ScheduledEvent, user: discord.User
     ) -> None:
-        if event_is_pub(event):
-            pub_event = await self.api_client.get_pub_event_by_discord_id(event.id)
-            if pub_event:
-                person = await self.api_client.get_person_for_discord_member(user)
-                pub_event = await self.api_client.remove_attendee_from_pub_event(
-                    pub_event.id, person.id
-                )
+        if self.pub_events.is_managed(event.id):
+            await self._remove_attendee(event, user)
+
+    # RSVPs are journaled, and reach the Ferry API in the order they were made even if it is
+    # unavailable for a while. An RSVP that is undone before it is replayed cancels out, so
+    # flapping users cost no API writes.
+    async def _add_attendee(self, event: discord.ScheduledEvent, user: discord.User) -> None:
+        await self.client.journal.append(
+            "pub.add_attendee",
+            {"scheduled_event_id": event.id, "user_id": user.id},
+            key=get_rsvp_key(event.id, user.id),
+        )
+
+    async def _remove_attendee(self, event: discord.ScheduledEvent, user: discord.User) -> None:
+        await self.client.journal.append(
+            "pub.remove_attendee",
+            {"scheduled_event_id": event.id, "user_id": user.id},
+            key=get_rsvp_key(event.id, user.id),
+        )
+
+    async def _replay_add_attendee(self, payload: dict[str, Any]) -> None:
+        pub_event = await self.api_client.get_pub_event_by_discord_id(payload["scheduled_event_id"])
+        if pub_event:
+            people = await self.api_client.get_people_for_discord_ids([payload["user_id"]])
+            if (person := people.get(payload["user_id"])) is None:
+                return
+            await self.api_client.add_attendee_to_pub_event(pub_event.id, person.id)
+            LOGGER.info(f"Added {person.display_name} to {pub_event}")
+
+    async def _replay_remove_attendee(self, payload: dict[str, Any]) -> None:
+        pub_event = await self.api_client.get_pub_event_by_discord_id(payload["scheduled_event_id"])
+        if pub_event:
+            people = await self.api_client.get_people_for_discord_ids([payload["user_id"]])
+            if (person := people.get(payload["user_id"])) is None:
+                return
+            pub_event = await self.api_client.remove_attendee_from_pub_event(
+                pub_event.id, person.id
+            )
 
-                if pub_event:
-                    attendee_ids = {a.id for a in pub_event.attendees}
-                    if person.id in attendee_ids:
-                        await user.send(
-                            f"You have removed your interest from the pub on {pub_event.timestamp}, but you are still registered on the pub system. Please log in and RSVP."
-                        )
-                    else:
-                        LOGGER.info(f"Removed {person.display_name} from {pub_event}")
+            attendee_ids = {a.id for a in pub_event.attendees}
+            if person.id in attendee_ids:
+                if user := await self.client.members.get(payload["user_id"]):
+                    await self.client.outbound.send_message(
+                        user,
+                        f"You have removed your interest from the pub on {pub_event.timestamp}, but you are still registered on the pub system. Please log in and RSVP.",
+                    )
+            else:
+                LOGGER.info(f"Removed {person.display_name} from {pub_event}")
+
+    async def _replay_update_table(self, payload: dict[str, Any]) -> None:
+        await self.api_client.update_table_for_pub_event(
+            UUID(payload["pub_event_id"]), payload["table_number"]
+        )
 
     async def handle_pub_event_change(
         self,
@@ -110,7 +195,8 @@ class PubModule(Module):
                 return
 
             formatted_pub_name = get_formatted_pub_name(pub, self.client.config)
-            await self.pub_channel.send(
+            await self.client.outbound.send_message(
+                self.pub_channel,
                 "\n".join(
                     [
                         "**Pub-O-Clock**",
@@ -127,7 +213,8 @@ class PubModule(Module):
                     "**📢 Pub Announcements 📢**",
                     "",
                 ]
-                await self.pub_channel.send(
+                await self.client.outbound.send_message(
+                    self.pub_channel,
                     "\n".join(header + [f"* {a}" for a in pub_event.announcements]),
                     view=get_pub_buttons_view(pub),
                 )
@@ -138,6 +225,7 @@ class PubModule(Module):
         ):
             # The Pub has ended.
             LOGGER.info("A pub event has ended.")
-            await self.pub_channel.send(
+            await self.client.outbound.send_message(
+                self.pub_channel,
                 "The pub is over. You are still not allowed to say that word.",
             )
@@ -2,11 +2,16 @@ from datetime import datetime, timedelta
 from logging import getLogger
 
 import discord
+import httpx
 from discord.app_commands import Group, command, describe
 
 from kmibot.config import BotConfig
+from kmibot.interactions import respond
+from kmibot.journal import WriteJournal
+from kmibot.outbound import OutboundQueue
 
-from .utils import event_is_pub, get_formatted_pub_name, get_pub_buttons_view
+from .index import PubEventIndex
+from .utils import get_formatted_pub_name, get_pub_buttons_view
 from .views import PubView
 from kmibot.api import (
     FerryAPI,
@@ -19,9 +24,19 @@ LOGGER = getLogger(__name__)
 
 
 class PubCommand(Group):
-    def __init__(self, config: BotConfig, api_client: FerryAPI) -> None:
+    def __init__(
+        self,
+        config: BotConfig,
+        api_client: FerryAPI,
+        outbound: OutboundQueue,
+        journal: WriteJournal,
+        pub_events: PubEventIndex,
+    ) -> None:
         self.config = config
         self.api_client = api_client
+        self.outbound = outbound
+        self.journal = journal
+        self.pub_events = pub_events
         super().__init__(name="pub", description="Manage the pub event")
 
     async def _choose_pub(
@@ -30,7 +45,8 @@ class PubCommand(Group):
         prompt: str,
     ) -> PubSchema:
         view = PubView(await self.api_client.get_pubs(), prompt)
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             prompt,
             view=view,
             ephemeral=True,
@@ -64,17 +80,9 @@ class PubCommand(Group):
         )
 
     def _get_next_pub_scheduled_event(
-        self, guild: discord.Guild, *, ignore_time: bool = False
+        self, *, ignore_time: bool = False
     ) -> discord.ScheduledEvent | None:
-        pub_time = self._get_next_pub_time()
-        for event in sorted(guild.scheduled_events, key=lambda se: se.start_time):
-            if (
-                event_is_pub(event)
-                and (ignore_time or event.start_time == pub_time)
-                and event.status in {discord.EventStatus.scheduled, discord.EventStatus.active}
-            ):
-                return event
-        return None
+        return self.pub_events.get_next(None if ignore_time else self._get_next_pub_time())
 
     async def _create_pub_event(
         self,
@@ -110,9 +118,10 @@ class PubCommand(Group):
         LOGGER.info(f"{interaction.user} used /pub next")
         assert interaction.guild is not None
 
-        if self._get_next_pub_scheduled_event(interaction.guild):
+        if self._get_next_pub_scheduled_event():
             LOGGER.info("A pub event already exists.")
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "A pub event already exists.",
                 ephemeral=True,
             )
@@ -177,7 +186,8 @@ class PubCommand(Group):
                 f"The following people have opted-out of AutoPub: {tombstone_mentions}",
             ]
 
-        await pub_channel.send(
+        await self.outbound.send_message(
+            pub_channel,
             "\n".join(message),
             view=get_pub_buttons_view(pub),
         )
@@ -186,10 +196,11 @@ class PubCommand(Group):
     async def attendees(self, interaction: discord.Interaction) -> None:
         assert interaction.guild
 
-        event = self._get_next_pub_scheduled_event(interaction.guild, ignore_time=True)
+        event = self._get_next_pub_scheduled_event(ignore_time=True)
         if event is None:
             LOGGER.info("No pub exists.")
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "There doesn't appear to be a pub at this time.",
                 ephemeral=True,
             )
@@ -197,7 +208,8 @@ class PubCommand(Group):
 
         pub_event = await self.api_client.get_pub_event_by_discord_id(event.id)
         if pub_event is None:
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "Unable to find the current pub event in the database.",
                 ephemeral=True,
             )
@@ -212,7 +224,8 @@ class PubCommand(Group):
             for attendee in pub_event.attendees
         ]
 
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             "\n".join(message),
             ephemeral=True,
         )
@@ -222,10 +235,11 @@ class PubCommand(Group):
         LOGGER.info(f"{interaction.user} used /pub change")
         assert interaction.guild is not None
 
-        scheduled_event = self._get_next_pub_scheduled_event(interaction.guild)
+        scheduled_event = self._get_next_pub_scheduled_event()
         if not scheduled_event:
             LOGGER.info("No upcoming pub event.")
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "There is no upcoming pub event. Use /pub next",
                 ephemeral=True,
             )
@@ -233,7 +247,8 @@ class PubCommand(Group):
 
         original_pub_event = await self.api_client.get_pub_event_by_discord_id(scheduled_event.id)
         if original_pub_event is None:
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "The pub event is incorrectly registered. Cannot update.",
                 ephemeral=True,
             )
@@ -292,7 +307,8 @@ class PubCommand(Group):
                 ],
             )
 
-        await pub_channel.send(
+        await self.outbound.send_message(
+            pub_channel,
             content,
             view=get_pub_buttons_view(pub),
         )
@@ -304,16 +320,18 @@ class PubCommand(Group):
     async def table(self, interaction: discord.Interaction, table_number: int) -> None:
         assert interaction.guild
         if table_number <= 0:
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "Sorry, the table number must exist in this dimension.",
                 ephemeral=True,
             )
             return
 
-        event = self._get_next_pub_scheduled_event(interaction.guild, ignore_time=True)
+        event = self._get_next_pub_scheduled_event(ignore_time=True)
         if event is None:
             LOGGER.info("No pub exists.")
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "There doesn't appear to be a pub at this time.",
                 ephemeral=True,
             )
@@ -321,7 +339,8 @@ class PubCommand(Group):
 
         pub_event = await self.api_client.get_pub_event_by_discord_id(event.id)
         if pub_event is None:
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "Cannot set the table number. Unable to find the current pub event in the database.",
                 ephemeral=True,
             )
@@ -330,15 +349,19 @@ class PubCommand(Group):
         pub = await self.api_client.get_pub(pub_event.pub)
         if pub is None:
             # This shouldn't happen, unless there's a race condition.
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "Something has gone wrong.",
                 ephemeral=True,
             )
             return
 
-        await self.api_client.update_table_for_pub_event(pub_event.id, table_number)
+        await self.journal.append(
+            "pub.update_table", {"pub_event_id": str(pub_event.id), "table_number": table_number}
+        )
 
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             f"Set table number to {table_number}, thanks.",
             ephemeral=True,
         )
@@ -350,7 +373,8 @@ class PubCommand(Group):
 
         LOGGER.info(f"Posting pub table info in {pub_channel}")
         formatted_pub_name = f"{pub.emoji} **{pub.name}** {self.config.pub.supplemental_emoji}"
-        await pub_channel.send(
+        await self.outbound.send_message(
+            pub_channel,
             "\n".join(
                 [
                     "**Pub Table**",
@@ -367,16 +391,18 @@ class PubCommand(Group):
     async def booked(self, interaction: discord.Interaction, table_size: int) -> None:
         assert interaction.guild
         if table_size <= 0:
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "Sorry, the table size must be at least 1.",
                 ephemeral=True,
             )
             return
 
-        event = self._get_next_pub_scheduled_event(interaction.guild, ignore_time=True)
+        event = self._get_next_pub_scheduled_event(ignore_time=True)
         if event is None:
             LOGGER.info("No pub exists.")
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "There doesn't appear to be a pub at this time.",
                 ephemeral=True,
             )
@@ -384,7 +410,8 @@ class PubCommand(Group):
 
         pub_event = await self.api_client.get_pub_event_by_discord_id(event.id)
         if pub_event is None:
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "Cannot mark the table as booked. Unable to find the current pub event in the database.",
                 ephemeral=True,
             )
@@ -393,7 +420,8 @@ class PubCommand(Group):
         pub = await self.api_client.get_pub(pub_event.pub)
         if pub is None:
             # This shouldn't happen, unless there's a race condition.
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "Something has gone wrong.",
                 ephemeral=True,
             )
@@ -404,13 +432,23 @@ class PubCommand(Group):
         try:
             await self.api_client.create_pub_booking(pub_event.id, table_size, person.id)
         except PubBookingAlreadyExistsError:
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "A table has already been booked for this pub event.",
                 ephemeral=True,
             )
             return
+        except httpx.HTTPError:
+            LOGGER.exception("Unable to create pub booking")
+            await respond(
+                interaction,
+                "Unable to mark the table as booked, please try again later.",
+                ephemeral=True,
+            )
+            return
 
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             f"Thanks for booking a table for {table_size}.",
             ephemeral=True,
         )
@@ -420,7 +458,8 @@ class PubCommand(Group):
 
         LOGGER.info(f"Posting pub booked info in {pub_channel}")
         formatted_pub_name = f"{pub.emoji} **{pub.name}** {self.config.pub.supplemental_emoji}"
-        await pub_channel.send(
+        await self.outbound.send_message(
+            pub_channel,
             "\n".join(
                 [
                     "**Pub is booked!**",
@@ -435,7 +474,8 @@ class PubCommand(Group):
         LOGGER.info(f"{interaction.user} used /pub next")
         assert interaction.guild is not None
 
-        await interaction.response.send_message(
+        await respond(
+            interaction,
             "\n".join(
                 [
                     "I manage the pub events, and keep data up to date between systems.",
@@ -460,9 +500,7 @@ class PubCommand(Group):
         LOGGER.info(f"{interaction.user} used /pub link")
         assert interaction.guild is not None
 
-        await interaction.response.send_message(
-            "Here you go:\n" + self.config.pub.web_url, ephemeral=True
-        )
+        await respond(interaction, "Here you go:\n" + self.config.pub.web_url, ephemeral=True)
 
     @command(description="If autopubbed, you can use this to opt-out of the next pub event")
     async def autoskip(self, interaction: discord.Interaction) -> None:
@@ -473,21 +511,32 @@ class PubCommand(Group):
         try:
             tombstone = await self.api_client.create_pub_event_tombstone(person.id)
         except PubEventTombstoneAlreadyExistsError:
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "You have already opted out of the next pub event",
                 ephemeral=True,
             )
             return
+        except httpx.HTTPError:
+            LOGGER.exception("Unable to create pub event tombstone")
+            await respond(
+                interaction,
+                "Unable to opt you out of the next pub event, please try again later.",
+                ephemeral=True,
+            )
+            return
 
         if tombstone.pub_event is None:
             # No next pub event scheduled yet - tombstone will be linked when one is created
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "You've opted out of the next scheduled pub. Your preference will be applied when an event is created.",
                 ephemeral=True,
             )
         else:
             # Next pub event exists - tombstone is linked and RSVP updated
-            await interaction.response.send_message(
+            await respond(
+                interaction,
                 "You've opted out of the next scheduled pub event.",
                 ephemeral=True,
             )
@@ -0,0 +1,76 @@
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from datetime import datetime
+from logging import getLogger
+
+import discord
+
+from .utils import event_is_pub
+
+LOGGER = getLogger(__name__)
+
+OPEN_STATUSES = {discord.EventStatus.scheduled, discord.EventStatus.active}
+
+
+class PubEventIndex:
+    """Upcoming pub scheduled events, ordered by start time.
+
+    The index is built from the guild when the bot is ready, then kept up to date from
+    scheduled event gateway events, so finding the next pub doesn't sort every event.
+    """
+
+    def __init__(self) -> None:
+        self._events: dict[int, discord.ScheduledEvent] = {}
+        self._order: list[tuple[datetime, int]] = []
+        # discord.py updates cached events in place, so remember where each one was indexed.
+        self._start_times: dict[int, datetime] = {}
+        self._managed: set[int] = set()
+        self._bot_user_id: int | None = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def rebuild(self, events: Iterable[discord.ScheduledEvent], bot_user_id: int) -> None:
+        self._bot_user_id = bot_user_id
+        self._events.clear()
+        self._order.clear()
+        self._start_times.clear()
+        self._managed.clear()
+        for event in events:
+            self.update(event)
+        LOGGER.info(f"Indexed {len(self)} upcoming pub events")
+
+    def update(self, event: discord.ScheduledEvent) -> None:
+        self.remove(event.id)
+        if not event_is_pub(event) or event.status not in OPEN_STATUSES:
+            return
+
+        self._events[event.id] = event
+        self._start_times[event.id] = event.start_time
+        insort(self._order, (event.start_time, event.id))
+        # Pub events made by anyone else are deleted, so only ours are in the Ferry API.
+        if event.creator_id is not None and event.creator_id == self._bot_user_id:
+            self._managed.add(event.id)
+
+    def remove(self, event_id: int) -> None:
+        if (start_time := self._start_times.pop(event_id, None)) is None:
+            return
+        del self._events[event_id]
+        del self._order[bisect_left(self._order, (start_time, event_id))]
+        self._managed.discard(event_id)
+
+    def is_managed(self, event_id: int) -> bool:
+        return event_id in self._managed
+
+    def get_managed(self) -> list[discord.ScheduledEvent]:
+        return [self._events[event_id] for _, event_id in self._order if event_id in self._managed]
+
+    def get_next(self, start_time: datetime | None = None) -> discord.ScheduledEvent | None:
+        """Get the first upcoming pub event, or the first starting at start_time."""
+        if start_time is None:
+            return self._events[self._order[0][1]] if self._order else None
+
+        i = bisect_left(self._order, (start_time, 0))
+        if i < len(self._order) and self._order[i][0] == start_time:
+            return self._events[self._order[i][1]]
+        return None
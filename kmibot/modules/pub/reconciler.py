@@ -0,0 +1,104 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from logging import getLogger
+
+import discord
+import httpx
+
+from kmibot import metrics
+from kmibot.api import FerryAPI
+from kmibot.journal import WriteJournal
+
+from .index import PubEventIndex
+from .utils import get_rsvp_key
+
+LOGGER = getLogger(__name__)
+
+RECONCILED = metrics.counter(
+    "kmibot_pub_attendees_reconciled_total",
+    "Differences found between Discord interest and Ferry attendees.",
+    ["change"],
+)
+
+
+class AttendeeReconciler:
+    """Add people who are interested in a pub event on Discord but missing from Ferry.
+
+    RSVPs can be missed, e.g. if a gateway event is lost while reconnecting or the
+    Ferry API is unavailable. This compares the two lists and applies the difference.
+    """
+
+    def __init__(
+        self,
+        api_client: FerryAPI,
+        journal: WriteJournal,
+        pub_events: PubEventIndex,
+        add_attendee: Callable[[discord.ScheduledEvent, discord.User], Awaitable[None]],
+        *,
+        interval: float,
+    ) -> None:
+        self._api_client = api_client
+        self._journal = journal
+        self._pub_events = pub_events
+        self._add_attendee = add_attendee
+        self._interval = interval
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._reconcile_periodically())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def reconcile(self) -> None:
+        if self._lock.locked():
+            LOGGER.info("Attendees are already being reconciled")
+            return
+
+        async with self._lock:
+            for event in self._pub_events.get_managed():
+                try:
+                    await self._reconcile_event(event)
+                # Resolving people uses a TaskGroup, so its errors arrive as an ExceptionGroup.
+                except* (discord.HTTPException, httpx.HTTPError):
+                    LOGGER.exception(f"Unable to reconcile attendees for {event.name}")
+
+    async def _reconcile_event(self, event: discord.ScheduledEvent) -> None:
+        pub_event = await self._api_client.get_pub_event_by_discord_id(event.id, use_cache=False)
+        if pub_event is None:
+            return
+
+        interested = {user.id: user async for user in event.users()}
+        attendees = {a.discord_id for a in pub_event.attendees if a.discord_id is not None}
+        tombstoned = {
+            a.discord_id for a in pub_event.tombstoned_attendees if a.discord_id is not None
+        }
+
+        # People who opted out on the Ferry side stay out. Attendees who aren't interested on
+        # Discord are left alone too, as they include people who opted in via AutoPub.
+        missing = interested.keys() - attendees - tombstoned
+        # Adds still waiting in the journal haven't reached Ferry yet, so don't add them again.
+        pending = await self._journal.get_pending_keys("pub.add_attendee")
+        missing = {user_id for user_id in missing if get_rsvp_key(event.id, user_id) not in pending}
+        RECONCILED.inc(len(missing), change="added")
+        RECONCILED.inc(len(attendees - interested.keys()), change="not_interested")
+        if not missing:
+            return
+
+        LOGGER.info(f"Adding {len(missing)} missing attendees to {event.name}")
+        # Resolve everyone at once, so each journaled add finds its person in the cache.
+        await self._api_client.get_people_for_discord_ids(missing, users=interested)
+        for user_id in missing:
+            await self._add_attendee(event, interested[user_id])
+
+    async def _reconcile_periodically(self) -> None:
+        while True:
+            try:
+                await self.reconcile()
+            except Exception:
+                LOGGER.exception("Unable to reconcile attendees")
+            await asyncio.sleep(self._interval)
@@ -8,6 +8,10 @@ def event_is_pub(event: discord.ScheduledEvent) -> bool:
     return "Pub" in event.name
 
 
+def get_rsvp_key(scheduled_event_id: int, user_id: int) -> str:
+    return f"{scheduled_event_id}:{user_id}"
+
+
 def get_pub_buttons_view(pub: PubSchema) -> discord.ui.View:
     view = discord.ui.View()
     view.add_item(discord.ui.Button(label="Map", url=str(pub.map_url)))
@@ -4,23 +4,27 @@ import discord
 
 from kmibot.api import PubSchema
 
+# Discord rejects select menus with more options than this, so longer lists are paged.
+MAX_SELECT_OPTIONS = 25
+
 
 class PubSelector(discord.ui.Select):
     def __init__(self, pubs: list[PubSchema], prompt: str) -> None:
-        self._pubs = pubs
         self.prompt = prompt
 
         self.selected = asyncio.Event()
         self.pub: PubSchema | None = None
 
-        options = [discord.SelectOption(label=pub.name, emoji=pub.emoji) for pub in pubs]
-
         super().__init__(
             placeholder="Choose a pub...",
             min_values=1,
             max_values=1,
-            options=options,
         )
+        self.set_pubs(pubs)
+
+    def set_pubs(self, pubs: list[PubSchema]) -> None:
+        self._pubs = pubs
+        self.options = [discord.SelectOption(label=pub.name, emoji=pub.emoji) for pub in pubs]
 
     async def callback(self, interaction: discord.Interaction) -> None:
         self.pub = discord.utils.find(
@@ -39,9 +43,41 @@ class PubView(discord.ui.View):
     def __init__(self, pubs: list[PubSchema], prompt: str) -> None:
         super().__init__()
 
-        self.pub_selector = PubSelector(pubs, prompt)
+        self._pages = [
+            pubs[i : i + MAX_SELECT_OPTIONS] for i in range(0, len(pubs), MAX_SELECT_OPTIONS)
+        ] or [[]]
+        self._page = 0
+
+        self.pub_selector = PubSelector(self._pages[0], prompt)
         self.add_item(self.pub_selector)
 
+        if len(self._pages) > 1:
+            self._update_buttons()
+        else:
+            self.remove_item(self.previous_page)
+            self.remove_item(self.next_page)
+
+    @discord.ui.button(label="Previous", row=1)
+    async def previous_page(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ) -> None:
+        await self._show_page(interaction, self._page - 1)
+
+    @discord.ui.button(label="Next", row=1)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        await self._show_page(interaction, self._page + 1)
+
+    async def _show_page(self, interaction: discord.Interaction, page: int) -> None:
+        self._page = page
+        self.pub_selector.set_pubs(self._pages[page])
+        self._update_buttons()
+        await interaction.response.edit_message(view=self)
+
+    def _update_buttons(self) -> None:
+        self.previous_page.disabled = self._page == 0
+        self.next_page.disabled = self._page == len(self._pages) - 1
+        self.pub_selector.placeholder = f"Choose a pub ({self._page + 1}/{len(self._pages)})..."
+
     async def wait_until_complete(self) -> PubSchema:
         await self.pub_selector.selected.wait()
         if self.pub_selector.pub is not None:
@@ -0,0 +1,208 @@
+import asyncio
+import itertools
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
+from logging import getLogger
+from typing import Any
+
+import discord
+
+from . import metrics
+
+LOGGER = getLogger(__name__)
+
+QUEUE_LATENCY = metrics.histogram(
+    "kmibot_outbound_queue_latency_seconds",
+    "Time outbound Discord actions spent queued before being sent.",
+    ["kind"],
+)
+QUEUE_DEPTH = metrics.gauge(
+    "kmibot_outbound_queue_depth",
+    "Outbound Discord actions waiting to be sent.",
+)
+DROPPED = metrics.counter(
+    "kmibot_outbound_dropped_total",
+    "Outbound Discord actions dropped because the queue was overloaded.",
+    ["kind"],
+)
+
+
+class Priority(IntEnum):
+    INTERACTION = 0
+    MESSAGE = 1
+    REACTION = 2
+
+
+@dataclass(frozen=True)
+class RouteLimit:
+    requests: int
+    per: float
+
+
+# Discord's documented per-route buckets, keyed by the major parameter (channel or user id).
+ROUTE_LIMITS = {
+    "interaction": RouteLimit(5, 2),
+    "message": RouteLimit(5, 5),
+    "dm": RouteLimit(5, 5),
+    "reaction": RouteLimit(1, 0.25),
+}
+
+
+class TokenBucket:
+    def __init__(self, limit: RouteLimit) -> None:
+        self.capacity = limit.requests
+        self.refill_rate = limit.requests / limit.per
+        self.tokens = float(limit.requests)
+        self.updated_at = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available, otherwise return how long until one is."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.refill_rate
+
+
+@dataclass(order=True)
+class OutboundAction:
+    priority: Priority
+    sequence: int
+    kind: str = field(compare=False)
+    bucket: tuple[str, int] = field(compare=False)
+    func: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future[Any] = field(compare=False)
+    queued_at: float = field(compare=False, default_factory=time.monotonic)
+
+
+class OutboundQueue:
+    """Send Discord actions in priority order without exceeding the per-route rate limits."""
+
+    def __init__(self, *, workers: int, max_reactions_queued: int) -> None:
+        self._worker_count = workers
+        self._max_reactions_queued = max_reactions_queued
+        self._queue: asyncio.PriorityQueue[OutboundAction] = asyncio.PriorityQueue()
+        self._buckets: dict[tuple[str, int], TokenBucket] = {}
+        self._sequence = itertools.count()
+        self._reactions_queued = 0
+        self._workers: set[asyncio.Task[None]] = set()
+        self._deferred: set[asyncio.Task[None]] = set()
+
+    def start(self) -> None:
+        for _ in range(self._worker_count):
+            task = asyncio.create_task(self._work(), name="outbound")
+            self._workers.add(task)
+            task.add_done_callback(self._workers.discard)
+
+    async def close(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._wait_until_idle(), timeout)
+        except TimeoutError:
+            LOGGER.warning(f"Gave up sending {self._queue.qsize()} outbound Discord actions")
+        for task in [*self._deferred, *self._workers]:
+            task.cancel()
+        await asyncio.gather(*self._deferred, *self._workers, return_exceptions=True)
+
+    async def _wait_until_idle(self) -> None:
+        while True:
+            await self._queue.join()
+            if not self._deferred:
+                return
+            await asyncio.wait(self._deferred)
+
+    def add_reaction(self, message: discord.Message, emoji: str) -> None:
+        if self._reactions_queued >= self._max_reactions_queued:
+            LOGGER.warning(f"Dropping {emoji} reaction, too many reactions are queued")
+            DROPPED.inc(kind="reaction")
+            return
+
+        self._reactions_queued += 1
+        future = self._submit(
+            Priority.REACTION,
+            "reaction",
+            ("reaction", message.channel.id),
+            lambda: message.add_reaction(emoji),
+        )
+        future.add_done_callback(self._on_reaction_done)
+
+    def send_message(
+        self, target: discord.TextChannel | discord.User | discord.Member, *args: Any, **kwargs: Any
+    ) -> asyncio.Future[discord.Message]:
+        kind = "message" if isinstance(target, discord.TextChannel) else "dm"
+        return self._submit(
+            Priority.MESSAGE, kind, (kind, target.id), lambda: target.send(*args, **kwargs)
+        )
+
+    def send_followup(
+        self, interaction: discord.Interaction, *args: Any, **kwargs: Any
+    ) -> asyncio.Future[discord.WebhookMessage]:
+        return self._submit(
+            Priority.INTERACTION,
+            "interaction",
+            ("interaction", interaction.id),
+            lambda: interaction.followup.send(*args, **kwargs),
+        )
+
+    def _submit(
+        self,
+        priority: Priority,
+        kind: str,
+        bucket: tuple[str, int],
+        func: Callable[[], Awaitable[Any]],
+    ) -> asyncio.Future[Any]:
+        future = asyncio.get_running_loop().create_future()
+        action = OutboundAction(priority, next(self._sequence), kind, bucket, func, future)
+        self._queue.put_nowait(action)
+        QUEUE_DEPTH.set(self._queue.qsize())
+        return future
+
+    def _defer(self, action: OutboundAction, delay: float) -> None:
+        task = asyncio.create_task(self._requeue_after(action, delay))
+        self._deferred.add(task)
+        task.add_done_callback(self._deferred.discard)
+
+    async def _requeue_after(self, action: OutboundAction, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            action.future.cancel()
+            raise
+        self._queue.put_nowait(action)
+        QUEUE_DEPTH.set(self._queue.qsize())
+
+    async def _work(self) -> None:
+        while True:
+            action = await self._queue.get()
+            QUEUE_DEPTH.set(self._queue.qsize())
+            try:
+                bucket = self._buckets.get(action.bucket)
+                if bucket is None:
+                    bucket = self._buckets[action.bucket] = TokenBucket(ROUTE_LIMITS[action.kind])
+
+                if (delay := bucket.try_acquire()) > 0:
+                    # Leave this worker free for other routes while the bucket refills.
+                    self._defer(action, delay)
+                    continue
+
+                if action.future.cancelled():
+                    continue
+                QUEUE_LATENCY.observe(time.monotonic() - action.queued_at, kind=action.kind)
+                try:
+                    result = await action.func()
+                except Exception as exc:  # noqa: BLE001
+                    if not action.future.done():
+                        action.future.set_exception(exc)
+                else:
+                    if not action.future.done():
+                        action.future.set_result(result)
+            finally:
+                self._queue.task_done()
+
+    def _on_reaction_done(self, future: asyncio.Future[Any]) -> None:
+        self._reactions_queued -= 1
+        if not future.cancelled() and (exc := future.exception()) is not None:
+            LOGGER.error("Unable to send outbound Discord action", exc_info=exc)
@@ -0,0 +1,103 @@
+import random
+import time
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from logging import getLogger
+
+import httpx
+
+LOGGER = getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+class FerryAPIUnavailableError(httpx.HTTPError):
+    """The circuit breaker is open, so the request was not sent."""
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Fail fast once the backend has failed repeatedly, then let a single trial through."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    def before_request(self) -> None:
+        if self.state is CircuitState.CLOSED:
+            return
+
+        # A trial that never reported back (e.g. it was cancelled) is replaced after a timeout.
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            LOGGER.info("Circuit breaker is half-open, allowing a trial request")
+            self.state = CircuitState.HALF_OPEN
+            self._opened_at = time.monotonic()
+            return
+        raise FerryAPIUnavailableError("The Ferry API is unavailable, not sending request")
+
+    def record_success(self) -> None:
+        if self.state is not CircuitState.CLOSED:
+            LOGGER.info("Circuit breaker closed")
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state is not CircuitState.OPEN:
+                LOGGER.warning(f"Circuit breaker opened after {self._failures} failures")
+            self.state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    def __init__(
+        self, max_retries: int, backoff_base: float, backoff_max: float, retry_after_max: float
+    ) -> None:
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+
+    def should_retry_error(self, method: str, exc: httpx.TransportError, attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if method in IDEMPOTENT_METHODS:
+            return True
+        # A non-idempotent request can only be retried if it definitely wasn't sent.
+        return isinstance(exc, httpx.ConnectError | httpx.ConnectTimeout)
+
+    def should_retry_response(self, method: str, resp: httpx.Response, attempt: int) -> bool:
+        if attempt >= self.max_retries or resp.status_code not in RETRYABLE_STATUS_CODES:
+            return False
+        return method in IDEMPOTENT_METHODS or resp.status_code == 429
+
+    def get_delay(self, attempt: int, resp: httpx.Response | None = None) -> float:
+        if resp is not None and (retry_after := self._parse_retry_after(resp)) is not None:
+            return min(retry_after, self.retry_after_max)
+        # Full jitter, so that concurrent callers don't retry in lockstep.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _parse_retry_after(self, resp: httpx.Response) -> float | None:
+        value = resp.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max((retry_at - datetime.now(tz=UTC)).total_seconds(), 0)
@@ -0,0 +1,64 @@
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from enum import Flag, auto
+
+import discord
+
+
+class AuthorKind(Flag):
+    HUMAN = auto()
+    BOT = auto()
+    ANY = HUMAN | BOT
+
+    @classmethod
+    def of(cls, user: discord.abc.User) -> "AuthorKind":  # noqa: ANN102
+        return cls.BOT if user.bot else cls.HUMAN
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """Interest in an event, optionally limited to some channels and kinds of author."""
+
+    event: str
+    handler: Callable[..., Awaitable[None]]
+    channel_ids: frozenset[int] | None = None
+    authors: AuthorKind = AuthorKind.HUMAN
+
+
+@dataclass(frozen=True)
+class Route:
+    module_name: str
+    subscription: Subscription
+
+
+class EventRouter:
+    def __init__(self) -> None:
+        self._any_channel: dict[str, list[Route]] = defaultdict(list)
+        self._by_channel: dict[tuple[str, int], list[Route]] = defaultdict(list)
+        self._authors: dict[str, AuthorKind] = defaultdict(lambda: AuthorKind(0))
+
+    def add(self, module_name: str, subscriptions: Iterable[Subscription]) -> None:
+        for subscription in subscriptions:
+            route = Route(module_name, subscription)
+            if subscription.channel_ids is None:
+                self._any_channel[subscription.event].append(route)
+            else:
+                for channel_id in subscription.channel_ids:
+                    self._by_channel[(subscription.event, channel_id)].append(route)
+            self._authors[subscription.event] |= subscription.authors
+
+    def match(self, event: str, channel_id: int, author: discord.abc.User) -> list[Route]:
+        author_kind = AuthorKind.of(author)
+        # Most messages are from humans, but this lets us drop bot chatter before any lookups.
+        if not self._authors.get(event, AuthorKind(0)) & author_kind:
+            return []
+
+        routes: list[Route] = []
+        for route in (
+            *self._any_channel.get(event, ()),
+            *self._by_channel.get((event, channel_id), ()),
+        ):
+            if route.subscription.authors & author_kind:
+                routes.append(route)
+        return routes